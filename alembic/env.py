@@ -20,7 +20,8 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-from src.models.content import Content, Language, ContentLanguage
+from src.models.content import Content, Language, ContentStats
+from src.models.upload import Upload
 
 target_metadata = SQLModel.metadata
 
@@ -0,0 +1,68 @@
+"""Compare upload loaders (COPY vs INSERT ... ON CONFLICT) in rows per second.
+
+Runs ContentService.create_content against the database in DATABASE_URL.
+The content, stats, language and upload tables are truncated between runs,
+so point it at a scratch database.
+
+    $ python -m benchmarks.bulk_load --rows 1000000 --loaders copy insert
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from sqlmodel import text
+
+from benchmarks.datagen import cached_csv, parse_rows
+from src.database import sessionmanager
+from src.services.content_service import ContentService
+from src.services.ingest import shutdown_executor
+from src.services.language_cache import language_cache
+
+
+async def reset_tables():
+    async with sessionmanager.connect() as connection:
+        await connection.execute(
+            text("TRUNCATE content, contentstats, language, upload RESTART IDENTITY")
+        )
+    # the cached ids belong to the truncated rows.
+    language_cache.clear()
+
+
+async def run_loader(csv_path: str, loader: str, rows: int) -> dict:
+    await reset_tables()
+    async with sessionmanager.session() as session:
+        started = time.perf_counter()
+        rows_per_chunk = await ContentService(session, loader=loader).create_content(
+            csv_path
+        )
+        elapsed = time.perf_counter() - started
+    assert sum(rows_per_chunk) == rows
+    return {
+        "loader": loader,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_rows, default=1_000_000)
+    parser.add_argument(
+        "--loaders", nargs="+", choices=["copy", "insert"], default=["copy", "insert"]
+    )
+    parser.add_argument("--csv", help="reuse an existing generated csv file")
+    args = parser.parse_args()
+
+    csv_path = args.csv or cached_csv(args.rows)
+
+    results = [await run_loader(csv_path, loader, args.rows) for loader in args.loaders]
+    await sessionmanager.close()
+    shutdown_executor()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""Deterministic synthetic catalog generator.
+
+Writes csv files in the schema accepted by POST /content/upload.
+
+    $ python -m benchmarks.datagen --rows 1m --output /tmp/catalog_1m.csv
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+from typing import TextIO
+
+# standard catalog sizes of the benchmark suite.
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+CSV_COLUMNS = [
+    "budget",
+    "revenue",
+    "runtime",
+    "status",
+    "homepage",
+    "original_language",
+    "original_title",
+    "title",
+    "overview",
+    "release_date",
+    "vote_average",
+    "vote_count",
+    "production_company_id",
+    "genre_id",
+    "languages",
+]
+
+# (spoken language, original_language code, weight)
+LANGUAGES = [
+    ("English", "en", 60),
+    ("Français", "fr", 8),
+    ("Español", "es", 8),
+    ("Deutsch", "de", 6),
+    ("Italiano", "it", 4),
+    ("日本語", "ja", 4),
+    ("Pусский", "ru", 3),
+    ("普通话", "zh", 3),
+    ("广州话 / 廣州話", "cn", 2),
+    ("हिन्दी", "hi", 2),
+    ("한국어/조선말", "ko", 2),
+    ("Português", "pt", 2),
+    ("No Language", "xx", 1),
+    ("??????", "xx", 1),
+]
+WORDS = (
+    "the a of in love night city war last dark man woman house story return "
+    "secret world life dead blood king time girl boy day road home summer"
+).split()
+STATUSES = ["Released"] * 18 + ["Post Production", "Rumored"]
+FIRST_RELEASE = date(1916, 1, 1)
+RELEASE_SPAN_DAYS = (date(2024, 12, 31) - FIRST_RELEASE).days
+
+
+def generate_rows(rows: int, seed: int = 42):
+    """Yield `rows` csv rows. The same seed always yields the same rows."""
+    rng = random.Random(seed)
+    language_names = [lang for lang, _, _ in LANGUAGES]
+    language_weights = [weight for _, _, weight in LANGUAGES]
+    for i in range(rows):
+        languages = set(
+            rng.choices(
+                language_names, language_weights, k=rng.choice([0, 1, 1, 1, 2, 3])
+            )
+        )
+        original_language = next(
+            (code for name, code, _ in LANGUAGES if name in languages), "en"
+        )
+        title = " ".join(rng.choices(WORDS, k=rng.randint(1, 4))).title()
+        release_date = FIRST_RELEASE + timedelta(days=rng.randrange(RELEASE_SPAN_DAYS))
+        budget = rng.choice([0, rng.randrange(10**5, 3 * 10**8, 10**5)])
+        yield [
+            budget if rng.random() > 0.02 else "",
+            rng.randrange(0, 10**9) if budget else 0,
+            rng.randint(60, 200) if rng.random() > 0.01 else "",
+            rng.choice(STATUSES),
+            f"http://example.com/content/{i}" if rng.random() < 0.3 else "",
+            original_language,
+            title,
+            title if rng.random() < 0.8 else f"{title} ({i})",
+            " ".join(rng.choices(WORDS, k=rng.randint(10, 60))).capitalize() + ".",
+            release_date.isoformat() if rng.random() > 0.005 else "",
+            round(rng.uniform(0, 10), 1),
+            rng.randint(0, 15000),
+            rng.randint(1, 5000),
+            rng.randint(1, 20),
+            repr(sorted(languages)),
+        ]
+
+
+def write_rows(csv_file: TextIO, rows: int, seed: int = 42):
+    writer = csv.writer(csv_file)
+    writer.writerow(CSV_COLUMNS)
+    writer.writerows(generate_rows(rows, seed))
+
+
+def write_csv(path: str, rows: int, seed: int = 42) -> str:
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        write_rows(csv_file, rows, seed)
+    return path
+
+
+def parse_rows(value: str) -> int:
+    """Row count argument, a number or one of SIZES."""
+    return SIZES.get(value.lower()) or int(value)
+
+
+def cached_csv(rows: int, seed: int = 42) -> str:
+    """Return the path of a generated catalog in the temp directory, writing it once."""
+    path = os.path.join(tempfile.gettempdir(), f"content_bench_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        write_csv(path, rows, seed)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_rows, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="catalog.csv")
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, args.seed)
+    print(f"wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
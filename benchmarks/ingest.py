@@ -0,0 +1,98 @@
+"""Measure POST /content/upload end to end, from the request to the finished job.
+
+The upload goes through an in-process ASGI client and the job is polled until
+it completes. The content tables of the database in DATABASE_URL are
+truncated first, so point it at a scratch database.
+
+    $ python -m benchmarks.ingest --rows 100k
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from sqlalchemy.future import select
+from sqlmodel import func, text
+
+from benchmarks.bulk_load import reset_tables
+from benchmarks.datagen import cached_csv, parse_rows
+from src.database import sessionmanager
+from src.models.content import Content
+from src.services.content_service import ContentService
+
+
+async def seed(rows: int):
+    """Load a synthetic catalog of rows rows, unless the content table has rows."""
+    async with sessionmanager.session() as session:
+        if await session.scalar(select(func.count()).select_from(Content)):
+            return
+        await ContentService(session).create_content(cached_csv(rows))
+        await session.execute(text("ANALYZE"))
+        await session.commit()
+
+
+@asynccontextmanager
+async def app_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Client of the application, with its lifespan running."""
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            yield client
+
+
+async def run_ingest(
+    client: httpx.AsyncClient, csv_path: str, rows: int, poll_seconds: float = 0.05
+) -> dict:
+    await reset_tables()
+    started = time.perf_counter()
+    with open(csv_path, "rb") as csv_file:
+        response = await client.post(
+            "/content/upload",
+            files={"file": (os.path.basename(csv_path), csv_file, "text/csv")},
+        )
+    assert response.status_code == 202, response.text
+    accepted = time.perf_counter() - started
+
+    job_id = response.json()["job_id"]
+    while True:
+        job = (await client.get(f"/content/upload/{job_id}")).json()
+        if job["completed"]:
+            break
+        await asyncio.sleep(poll_seconds)
+    elapsed = time.perf_counter() - started
+    assert job["status"] == "completed", job["errors"]
+    assert job["rows_inserted"] == rows, job
+
+    return {
+        "rows": rows,
+        "accept_seconds": round(accepted, 3),
+        "total_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed),
+        "job_rows_per_second": job["rows_per_second"],
+        "chunks": len(job["rows_per_chunk"]),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_rows, default=100_000)
+    args = parser.parse_args()
+
+    csv_path = cached_csv(args.rows)
+    async with app_client() as client:
+        result = await run_ingest(client, csv_path, args.rows)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+"""Replay a deterministic mix of GET /content requests and report their latency.
+
+Requests are drawn from weighted filter, sort and page patterns with a fixed
+seed, so every run sends the same requests in the same order. They go through
+an in-process ASGI client against the database in DATABASE_URL, which is
+seeded when the content table is empty. The response cache is disabled unless
+--cache is given, so that the queries are measured.
+
+    $ python -m benchmarks.read_replay --rows 100k --requests 2000 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.datagen import LANGUAGES, parse_rows
+from benchmarks.ingest import app_client, seed
+from src.config import settings
+
+SORTS = [
+    "release_date:desc",
+    "release_date:asc",
+    "rating:desc",
+    "rating:desc,release_date:desc",
+    "release_date:desc,rating:asc",
+]
+LANGUAGE_NAMES = [name for name, _, _ in LANGUAGES]
+LANGUAGE_WEIGHTS = [weight for _, _, weight in LANGUAGES]
+
+
+def language(rng: random.Random) -> str:
+    return rng.choices(LANGUAGE_NAMES, LANGUAGE_WEIGHTS)[0].lower()
+
+
+def year(rng: random.Random) -> int:
+    return rng.randint(1920, 2024)
+
+
+def year_range(rng: random.Random) -> str:
+    start = year(rng)
+    return f"{start}-{min(start + rng.randint(1, 10), 2024)}"
+
+
+# name -> (weight, params factory), the weights follow a listing UI.
+PATTERNS = {
+    "first_page": (20, lambda rng: {"sort": rng.choice(SORTS)}),
+    "browse_pages": (
+        15,
+        lambda rng: {"sort": rng.choice(SORTS), "page": rng.randint(2, 20)},
+    ),
+    "year": (15, lambda rng: {"year": year(rng), "sort": rng.choice(SORTS)}),
+    "year_range": (10, lambda rng: {"year": year_range(rng), "sort": "rating:desc"}),
+    "language": (
+        15,
+        lambda rng: {"language": language(rng), "sort": "release_date:desc"},
+    ),
+    "language_year": (
+        10,
+        lambda rng: {"language": language(rng), "year": year(rng)},
+    ),
+    "deep_offset": (
+        5,
+        lambda rng: {
+            "page": rng.randint(100, 500),
+            "page_size": 100,
+            "count": "cached",
+            "sort": "release_date:desc",
+        },
+    ),
+    "narrow_fields": (
+        10,
+        lambda rng: {
+            "fields": "title,release_date,rating",
+            "sort": rng.choice(SORTS),
+            "page_size": 100,
+        },
+    ),
+}
+
+
+def build_requests(count: int, seed_value: int) -> List[Tuple[str, Dict]]:
+    rng = random.Random(seed_value)
+    names = list(PATTERNS)
+    weights = [PATTERNS[name][0] for name in names]
+    return [
+        (name, PATTERNS[name][1](rng))
+        for name in rng.choices(names, weights, k=count)
+    ]
+
+
+def percentile(timings: List[float], pct: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(timings: List[float]) -> dict:
+    return {
+        "requests": len(timings),
+        "p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "p95_ms": round(percentile(timings, 95) * 1000, 2),
+        "p99_ms": round(percentile(timings, 99) * 1000, 2),
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+    }
+
+
+async def run_reads(
+    client: httpx.AsyncClient, requests: int, concurrency: int, seed_value: int = 42
+) -> dict:
+    plan = build_requests(requests, seed_value)
+    # warm up the pool, the language cache and the statement caches.
+    for _, params in plan[:50]:
+        await client.get("/content", params=params)
+
+    timings: Dict[str, List[float]] = defaultdict(list)
+    queue = iter(plan)
+
+    async def worker():
+        for name, params in queue:
+            started = time.perf_counter()
+            response = await client.get("/content", params=params)
+            timings[name].append(time.perf_counter() - started)
+            assert response.status_code == 200, (params, response.text)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    every = [timing for pattern in timings.values() for timing in pattern]
+    return {
+        "concurrency": concurrency,
+        "requests_per_second": round(requests / elapsed, 1),
+        "all": summarize(every),
+        "patterns": {name: summarize(timings[name]) for name in sorted(timings)},
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_rows, default=100_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="keep the response cache")
+    args = parser.parse_args()
+
+    settings.RESPONSE_CACHE_ENABLED = args.cache
+    await seed(args.rows)
+    async with app_client() as client:
+        result = await run_reads(client, args.requests, args.concurrency, args.seed)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""Benchmark result reports, and their comparison across commits.
+
+Reports are JSON files holding the environment they were produced in and the
+nested results of the suite. Compare two of them with:
+
+    $ python -m benchmarks.report base.json head.json --threshold 10
+
+Exits with 1 when a timing or throughput regressed by more than threshold
+percent.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+
+def git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(status),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(path: str, results: dict, **extra) -> dict:
+    report = {"environment": {**environment(), **extra}, "results": results}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as report_file:
+        json.dump(report, report_file, indent=2, default=str)
+    return report
+
+
+def flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    """Map dotted paths to the numbers of a nested result dict."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def direction(path: str) -> int:
+    """1 when a larger value is better, -1 when smaller is, 0 to not compare."""
+    if path.endswith("per_second"):
+        return 1
+    if path.endswith(("_ms", "_seconds", "_kib")):
+        return -1
+    return 0
+
+
+def compare(base: dict, head: dict, threshold: float) -> List[dict]:
+    base_results = flatten(base["results"])
+    head_results = flatten(head["results"])
+    rows = []
+    for path in sorted(base_results.keys() & head_results.keys()):
+        better = direction(path)
+        old, new = base_results[path], head_results[path]
+        if not better or not old:
+            continue
+        change = (new - old) / old * 100
+        rows.append(
+            {
+                "metric": path,
+                "base": old,
+                "head": new,
+                "change_pct": round(change, 1),
+                "regression": change * better < -threshold,
+            }
+        )
+    return rows
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with open(args.base) as base_file, open(args.head) as head_file:
+        base, head = json.load(base_file), json.load(head_file)
+    rows = compare(base, head, args.threshold)
+
+    width = max((len(row["metric"]) for row in rows), default=6)
+    print(f"base {base['environment']['commit']}  head {head['environment']['commit']}")
+    print(f"{'metric':<{width}}  {'base':>12}  {'head':>12}  {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['metric']:<{width}}  {row['base']:>12}  {row['head']:>12}  "
+            f"{row['change_pct']:>+7.1f}%{flag}"
+        )
+    return not any(row["regression"] for row in rows)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,142 @@
+"""Compare GET /content latency and allocations, lean read path vs ORM entities.
+
+The legacy route reproduces the previous path: ORM Content entities validated
+into ContentResponse, wrapped in ContentListResponse and serialized again by
+FastAPI through response_model. The lean route is the application's GET
+/content, with the response cache disabled so every request reaches the
+database. Both run in process through an ASGI client, against the database in
+DATABASE_URL, which is seeded when the content table is empty.
+
+    $ python -m benchmarks.serialization --rows 100000 --page-size 100
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import statistics
+import time
+import tracemalloc
+
+import httpx
+from fastapi import Depends, FastAPI, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from benchmarks.datagen import parse_rows
+from benchmarks.ingest import seed
+from main import app
+from src.config import settings
+from src.database import get_db_session, sessionmanager
+from src.models.content import Content
+from src.schema.query_params import (
+    ContentFilterParams,
+    ContentListResponse,
+    ContentResponse,
+    ContentSortParams,
+    CountMode,
+    PaginationParams,
+    PaginationResponse,
+)
+from src.services.content_service import ContentService
+from src.services.ingest import shutdown_executor
+
+SORT = [ContentSortParams(field="release_date", direction="desc")]
+
+legacy_app = FastAPI()
+
+
+@legacy_app.get("/content", response_model=ContentListResponse)
+async def legacy_list_content(
+    page: int = Query(1),
+    page_size: int = Query(20),
+    count: CountMode = Query(CountMode.EXACT),
+    session: AsyncSession = Depends(get_db_session),
+):
+    """GET /content as it was before the lean read path, without the cursor."""
+    service = ContentService(session)
+    filters = ContentFilterParams()
+    pagination = PaginationParams(page=page, page_size=page_size, count=count)
+    query = await service.filter_query(select(Content), filters)
+    total, count_mode = await service.count_content(query, filters, pagination.count)
+    query = service.order_query(query, service.get_sort_keys(SORT))
+    items = await session.execute(
+        query.offset((page - 1) * page_size).limit(page_size + 1)
+    )
+    items = items.scalars().all()[:page_size]
+    return ContentListResponse(
+        data=[ContentResponse.model_validate(item) for item in items],
+        pagination=PaginationResponse(
+            current_page=page,
+            page_size=page_size,
+            total_items=total,
+            total_pages=math.ceil(total / page_size),
+            count_mode=count_mode,
+        ),
+    )
+
+
+def percentile(timings: list[float], pct: float) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def measure(target: FastAPI, requests: int, page_size: int, pages: int) -> dict:
+    # cached counts, so the timings are not dominated by count(*).
+    url = "/content?sort=release_date:desc&count=cached&page_size={}&page={}"
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        # warm up the pool, the caches and the statement cache.
+        for page in range(1, pages + 1):
+            response = await c.get(url.format(page_size, page))
+            assert response.status_code == 200, response.text
+            assert len(response.json()["data"]) == page_size
+
+        timings = []
+        for i in range(requests):
+            started = time.perf_counter()
+            await c.get(url.format(page_size, i % pages + 1))
+            timings.append(time.perf_counter() - started)
+
+        # traced separately, tracemalloc slows every allocation down.
+        peaks = []
+        tracemalloc.start()
+        for i in range(min(requests, 100)):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await c.get(url.format(page_size, i % pages + 1))
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "p99_ms": round(percentile(timings, 99) * 1000, 2),
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+        "peak_alloc_kib": round(statistics.median(peaks) / 1024, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=parse_rows, default=100_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    await seed(args.rows)
+    settings.RESPONSE_CACHE_ENABLED = False
+    report = {"page_size": args.page_size, "requests": args.requests}
+    for name, target in (("orm_entities", legacy_app), ("lean", app)):
+        report[name] = await measure(target, args.requests, args.page_size, args.pages)
+    report["p50_speedup"] = round(
+        report["orm_entities"]["p50_ms"] / report["lean"]["p50_ms"], 2
+    )
+    print(json.dumps(report, indent=2))
+    await sessionmanager.close()
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""Measure worker startup: import time and RSS of the application, per csv engine.
+
+Every measurement runs in a fresh interpreter, which imports main, the
+way a uvicorn worker does, and then parses one upload chunk in process, the
+way UPLOAD_PARSE_WORKERS=0 does. "eager" imports pandas before main, which is
+what every worker paid when pandas was imported at module load. Needs no
+database.
+
+    $ python -m benchmarks.startup --repeat 5 --rows 10k
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.datagen import cached_csv, parse_rows
+
+# runs in the measured interpreter, prints one JSON line.
+CHILD = """
+import json, sys, time
+
+def rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+started = time.perf_counter()
+if {eager}:
+    import pandas
+import main
+imported = time.perf_counter() - started
+result = {{
+    "import_seconds": imported,
+    "rss_mb": rss_mb(),
+    "pandas_loaded": "pandas" in sys.modules,
+}}
+
+from src.config import settings
+from src.services.ingest import parse_range, split_row_ranges
+
+header, ranges = split_row_ranges({csv_path!r}, 1 << 40)
+started = time.perf_counter()
+parse_range({csv_path!r}, header, *ranges[0], settings.UPLOAD_CSV_ENGINE)
+result["parse_seconds"] = time.perf_counter() - started
+result["rss_after_parse_mb"] = rss_mb()
+print(json.dumps(result))
+"""
+
+CONFIGURATIONS = {
+    "eager": {"UPLOAD_CSV_ENGINE": "pandas"},
+    "pandas": {"UPLOAD_CSV_ENGINE": "pandas"},
+    "csv": {"UPLOAD_CSV_ENGINE": "csv"},
+}
+
+
+def measure(name: str, csv_path: str) -> dict:
+    code = CHILD.format(eager=name == "eager", csv_path=csv_path)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, **CONFIGURATIONS[name]},
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rows", type=parse_rows, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    csv_path = cached_csv(args.rows, args.seed)
+    report = []
+    for name in CONFIGURATIONS:
+        runs = [measure(name, csv_path) for _ in range(args.repeat)]
+        report.append(
+            {
+                "configuration": name,
+                "pandas_loaded_at_startup": runs[0]["pandas_loaded"],
+                **{
+                    key: round(statistics.median(run[key] for run in runs), 3)
+                    for key in (
+                        "import_seconds",
+                        "rss_mb",
+                        "parse_seconds",
+                        "rss_after_parse_mb",
+                    )
+                },
+            }
+        )
+    print(
+        json.dumps(
+            {"rows": args.rows, "repeat": args.repeat, "results": report}, indent=2
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Run the ingestion and read benchmarks per catalog size and write a JSON report.
+
+For every size the content tables are truncated, the generated catalog is
+uploaded through POST /content/upload and the read mix is replayed against
+it. Use a scratch database in DATABASE_URL. Compare reports of two commits
+with benchmarks.report.
+
+    $ python -m benchmarks.suite --sizes 10k 100k --output results/head.json
+    $ python -m benchmarks.report results/base.json results/head.json
+"""
+
+import argparse
+import asyncio
+import json
+
+from sqlmodel import text
+
+from benchmarks.datagen import SIZES, cached_csv, parse_rows
+from benchmarks.ingest import app_client, run_ingest
+from benchmarks.read_replay import run_reads
+from benchmarks.report import git, write_report
+from src.config import settings
+from src.database import sessionmanager
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["10k", "100k"])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="default: benchmark-results/<commit>.json")
+    args = parser.parse_args()
+
+    # the read mix measures queries, not the response cache.
+    settings.RESPONSE_CACHE_ENABLED = False
+    results = {}
+    async with app_client() as client:
+        for size in args.sizes:
+            rows = parse_rows(size)
+            name = next((key for key, value in SIZES.items() if value == rows), size)
+            csv_path = cached_csv(rows, args.seed)
+            ingest = await run_ingest(client, csv_path, rows)
+            async with sessionmanager.connect() as connection:
+                await connection.execute(text("ANALYZE"))
+            reads = await run_reads(client, args.requests, args.concurrency, args.seed)
+            results[name] = {"ingest": ingest, "read": reads}
+            print(json.dumps({name: results[name]["ingest"]}), flush=True)
+
+    output = (
+        args.output or f"benchmark-results/{git('rev-parse', '--short', 'HEAD')}.json"
+    )
+    write_report(
+        output,
+        results,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        seed=args.seed,
+        loader=settings.UPLOAD_LOADER,
+        parse_workers=settings.UPLOAD_PARSE_WORKERS,
+    )
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
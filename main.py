@@ -1,10 +1,20 @@
+import logging
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from src.cache import count_cache, response_cache
+from src.config import settings
 from src.database import sessionmanager
+from src.metrics import MetricsMiddleware, metrics
 from src.routers import content_router
+from src.services.ingest import shutdown_executor
+from src.services.language_cache import language_cache
+from src.services.upload_jobs import upload_jobs
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -13,13 +23,29 @@ async def lifespan(app: FastAPI):
     Function that handles startup and shutdown events.
     To understand more, read https://fastapi.tiangolo.com/advanced/events/
     """
+    try:
+        if settings.DB_POOL_PREWARM:
+            await sessionmanager.prewarm(settings.DB_POOL_SIZE)
+        async with sessionmanager.session() as session:
+            await language_cache.warm(session)
+    except Exception:
+        # both fill up on demand if the database is not reachable yet.
+        logger.warning(
+            "Could not warm the connection pool and language cache", exc_info=True
+        )
     yield
+    await upload_jobs.shutdown()
+    shutdown_executor()
     if sessionmanager._engine is not None:
         await sessionmanager.close()
 
 
 app = FastAPI(lifespan=lifespan, title="Content System")
 app.include_router(content_router.router)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    for database, engine in sessionmanager.engines().items():
+        metrics.instrument_engine(engine, database)
 
 
 @app.get("/health-check", tags=["health check"])
@@ -27,5 +53,74 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health-check/caches", tags=["health check"])
+async def cache_stats():
+    return {
+        "language": language_cache.stats(),
+        "count": count_cache.stats(),
+        "response": response_cache.stats(),
+    }
+
+
+@app.get("/health-check/db", tags=["health check"])
+async def db_pool_stats():
+    return sessionmanager.pool_stats()
+
+
+def pool_and_cache_metrics():
+    pools = sessionmanager.pool_stats()
+    yield (
+        "content_db_pool_connections",
+        "gauge",
+        "Pooled connections by state.",
+        [
+            ({"pool": pool, "state": state}, stats[state])
+            for pool, stats in pools.items()
+            for state in ("checked_out", "idle", "overflow")
+            if state in stats
+        ],
+    )
+    for name, key, documentation in (
+        ("content_db_pool_checkouts_total", "checkouts", "Connection checkouts."),
+        ("content_db_pool_timeouts_total", "timeouts", "Checkouts that timed out."),
+        (
+            "content_db_pool_wait_seconds_total",
+            "wait_seconds_total",
+            "Time checkouts waited for a connection.",
+        ),
+    ):
+        samples = [
+            ({"pool": pool}, stats[key])
+            for pool, stats in pools.items()
+            if key in stats
+        ]
+        yield name, "counter", documentation, samples
+
+    caches = {
+        "language": language_cache.stats(),
+        "count": count_cache.stats(),
+        "response": response_cache.stats(),
+    }
+    for key in ("hits", "misses"):
+        yield (
+            f"content_cache_{key}_total",
+            "counter",
+            f"Cache {key}.",
+            [({"cache": cache}, stats[key]) for cache, stats in caches.items()],
+        )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics are disabled\n", status_code=404)
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+metrics.add_collector(pool_and_cache_metrics)
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", port=8000, host="0.0.0.0", reload=True)
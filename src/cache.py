@@ -0,0 +1,256 @@
+import hashlib
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from src.config import settings
+
+
+class TTLCache:
+    """Bounded in-memory LRU mapping whose entries expire after ttl_seconds."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        expires = time.monotonic() + (ttl_seconds or self.ttl_seconds)
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+        }
+
+
+class CacheBackend(ABC):
+    """Storage for cached responses and the counters shared by cache users."""
+
+    # whether every worker process sees the same entries and counters.
+    shared = False
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: float): ...
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def get_timestamp(self, key: str) -> Optional[float]: ...
+
+    @abstractmethod
+    async def set_timestamp(self, key: str, value: float): ...
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process backend, entries are evicted by LRU order and ttl."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self._cache = TTLCache(max_entries, ttl_seconds)
+        self._counters: dict[str, int] = {}
+        self._timestamps: dict[str, float] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float):
+        self._cache.set(key, value, ttl_seconds)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_timestamp(self, key: str) -> Optional[float]:
+        return self._timestamps.get(key)
+
+    async def set_timestamp(self, key: str, value: float):
+        self._timestamps[key] = value
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend shared by every worker process, needs the optional redis package.
+
+    Eviction is left to the redis server, configure it with an LRU
+    maxmemory-policy such as allkeys-lru.
+    """
+
+    shared = True
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "CACHE_URL points to redis, install the redis package to use it"
+            ) from exc
+        self._redis = redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self._redis.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float):
+        await self._redis.set(key, value, px=int(ttl_seconds * 1000))
+
+    async def get_counter(self, key: str) -> int:
+        value = await self._redis.get(key)
+        if value is None:
+            # an evicted or lost counter restarts at the time in microseconds,
+            # above every value it had (a bump is a committed upload), so no
+            # earlier version is reused.
+            await self._redis.set(key, time.time_ns() // 1000, nx=True)
+            value = await self._redis.get(key)
+        return int(value)
+
+    async def incr(self, key: str) -> int:
+        await self.get_counter(key)
+        return await self._redis.incr(key)
+
+    async def get_timestamp(self, key: str) -> Optional[float]:
+        value = await self._redis.get(key)
+        return None if value is None else float(value)
+
+    async def set_timestamp(self, key: str, value: float):
+        await self._redis.set(key, repr(value))
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+        }
+
+
+def create_backend(url: Optional[str]) -> CacheBackend:
+    if url:
+        return RedisCacheBackend(url)
+    return MemoryCacheBackend(
+        settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS
+    )
+
+
+def request_digest(*request_key) -> str:
+    """Digest of a normalized request, as part of cache keys and ETags."""
+    return hashlib.sha1(
+        json.dumps(request_key, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class DatasetVersion:
+    """Counter of catalog changes, bumped every time an upload commits rows.
+
+    Cache keys include the current version, so entries computed before an
+    upload are never served after it. The counter and the time of the last
+    bump live in the cache backend, so a shared backend invalidates the caches
+    of every worker process, and sends all of their reads to the primary
+    right after an upload, see DatabaseSessionManager.
+    """
+
+    KEY = "content:dataset_version"
+    WRITE_KEY = "content:last_write"
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+
+    async def current(self) -> int:
+        return await self.backend.get_counter(self.KEY)
+
+    async def bump(self) -> int:
+        # before the increment, readers of the new version see a recent write.
+        await self.backend.set_timestamp(self.WRITE_KEY, time.time())
+        return await self.backend.incr(self.KEY)
+
+    async def last_write(self) -> float:
+        """Wall clock time of the last bump, by any process sharing the backend."""
+        written = await self.backend.get_timestamp(self.WRITE_KEY)
+        return -math.inf if written is None else written
+
+    @property
+    def shared(self) -> bool:
+        """Whether every worker process reads and bumps the same counter."""
+        return self.backend.shared
+
+
+class ResponseCache:
+    """Serialized responses keyed on the dataset version and normalized request."""
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+
+    def key(self, version: int, digest: str, encoding: Optional[str] = None) -> str:
+        key = f"content:response:{version}:{digest}"
+        return f"{key}:{encoding}" if encoding else key
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.backend.get(key)
+
+    async def set(self, key: str, body: bytes):
+        await self.backend.set(key, body, self.ttl_seconds)
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+cache_backend = create_backend(settings.CACHE_URL)
+dataset_version = DatasetVersion(cache_backend)
+response_cache = ResponseCache(cache_backend, settings.RESPONSE_CACHE_TTL_SECONDS)
+count_cache = TTLCache(
+    settings.COUNT_CACHE_MAX_ENTRIES, settings.COUNT_CACHE_TTL_SECONDS
+)
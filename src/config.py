@@ -1,6 +1,9 @@
 import os
+import tempfile
+from typing import Literal, Optional
 
 from dotenv import load_dotenv
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 load_dotenv()
@@ -10,7 +13,76 @@ class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv(
         "DATABASE_URL", "postgresql+asyncpg://postgres:@localhost/content_system"
     )
+    # optional read replica, GET endpoints read from it instead of DATABASE_URL.
+    DATABASE_READ_URL: Optional[str] = None
+    # reads go to the primary for this many seconds after an upload commits rows,
+    # set it above the replica lag so clients see their own uploads. The upload
+    # time is kept next to the dataset version, in every worker process only
+    # when CACHE_URL is set.
+    READ_YOUR_WRITES_SECONDS: float = 0
+    # seconds before a replica that failed to connect is tried again.
+    READ_REPLICA_RETRY_SECONDS: float = 30
     ECHO_SQL: bool = False
+    # connections kept open by the pool, and extra ones opened under load.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # seconds to wait for a connection before failing the request.
+    DB_POOL_TIMEOUT: float = 30
+    # connections older than this many seconds are replaced, -1 keeps them.
+    DB_POOL_RECYCLE: int = 1800
+    # test connections before handing them out, drops ones closed by the server.
+    DB_POOL_PRE_PING: bool = True
+    # open DB_POOL_SIZE connections at startup.
+    DB_POOL_PREWARM: bool = True
+    # prepared statements cached per connection, by asyncpg and by SQLAlchemy's
+    # asyncpg dialect, both are sized with it. 0 behind pgbouncer in transaction
+    # pooling mode disables both caches.
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # seconds before a statement is cancelled by the client, unset waits forever.
+    DB_COMMAND_TIMEOUT: Optional[float] = None
+    # uploads are split into row-aligned chunks of about this many bytes.
+    UPLOAD_CHUNK_BYTES: int = 4 * 1024 * 1024
+    # processes parsing upload chunks in parallel, 0 parses on a thread instead.
+    UPLOAD_PARSE_WORKERS: int = os.cpu_count() or 1
+    # "copy" upserts chunks through a COPY staging table, "insert" with batched
+    # INSERT ... ON CONFLICT statements.
+    UPLOAD_LOADER: Literal["copy", "insert"] = "copy"
+    # "pandas" parses upload chunks with pandas.read_csv, "csv" with the stdlib
+    # csv module, so that parsing processes never import pandas and numpy.
+    UPLOAD_CSV_ENGINE: Literal["pandas", "csv"] = "pandas"
+    # uploads are spooled to this directory and ingested by background jobs.
+    UPLOAD_SPOOL_DIR: str = tempfile.gettempdir()
+    UPLOAD_MAX_CONCURRENT_JOBS: int = 2
+    # number of finished upload jobs kept for status queries.
+    UPLOAD_JOB_HISTORY_SIZE: int = 1000
+    # memoized GET /content total counts, the ttl bounds how long other worker
+    # processes can serve counts from before an upload they did not process.
+    COUNT_CACHE_MAX_ENTRIES: int = 10_000
+    COUNT_CACHE_TTL_SECONDS: float = 300
+    # GET /content responses are cached per process, or in redis when CACHE_URL
+    # is set (redis://...) so that all worker processes share entries.
+    CACHE_URL: Optional[str] = None
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_TTL_SECONDS: float = 60
+    # Cache-Control of GET /content, clients and proxies revalidate with the ETag,
+    # sent when CACHE_URL is set.
+    HTTP_CACHE_CONTROL: str = "public, max-age=0, must-revalidate"
+    # GET /content bodies of at least this many bytes are compressed with gzip,
+    # or brotli when the brotli package is installed, unset never compresses.
+    RESPONSE_COMPRESSION_MIN_BYTES: Optional[int] = 1024
+    # request, query and upload stage timings, served at /metrics.
+    METRICS_ENABLED: bool = True
+    # rows fetched per round trip from the server-side cursor of GET /content/export.
+    EXPORT_BATCH_SIZE: int = 1000
+    # most ids a single POST /content/batch request may ask for.
+    BATCH_MAX_IDS: int = 100
+
+    @field_validator("UPLOAD_LOADER", mode="before")
+    @classmethod
+    def rename_orm_loader(cls, value):
+        # "orm" is the former name of "insert", which no longer goes through the ORM.
+        return "insert" if value == "orm" else value
 
 
 settings = Settings()
@@ -1,26 +1,177 @@
-import io
+from typing import AsyncIterator
 
+import orjson
 from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
 
+from src.cache import dataset_version, request_digest, response_cache
+from src.config import settings
+from src.database import sessionmanager
+from src.http_cache import (
+    CachedBody,
+    compress,
+    entity_tag,
+    matching_etag,
+    negotiate_encoding,
+    should_compress,
+)
 from src.schema.query_params import (
     ContentFilterParams,
     ContentSortParams,
+    CountMode,
+    ExportFormat,
     PaginationParams,
     SortDirection,
+    StatsGroup,
 )
-from src.services.content_service import ContentService
+from src.services.content_service import RESPONSE_FIELDS, ContentService
+from src.services.export import stream_export
+from src.services.upload_jobs import UploadJob, upload_jobs
 from src.utils import validate_csv_file
 
 
 class ContentController:
-    def __init__(self, content_service):
+    def __init__(self, content_service=None):
         self.content_service: ContentService = content_service
 
     async def get_content(
-        self, year: str, language: str, sort: str, page: int, page_size: int
-    ):
+        self,
+        year: str,
+        language: str,
+        sort: str,
+        page: int,
+        page_size: int,
+        cursor: str = None,
+        count: CountMode = CountMode.EXACT,
+        fields: str = None,
+        q: str = None,
+        if_none_match: str = None,
+        accept_encoding: str = None,
+    ) -> CachedBody:
+        """Return the serialized page and its ETag, body is None if not modified.
+
+        The ETag only depends on the dataset version and the normalized request,
+        so If-None-Match is answered before a session is opened. There is no
+        ETag unless the version is shared by every worker process (CACHE_URL),
+        per process versions would not match the uploads of other workers, nor
+        for bodies read from a replica that may lag, see is_fresh.
+        Large bodies are compressed with the encoding the client prefers.
+        """
+        filters = ContentFilterParams(year=year, language=language, q=q)
+        selected_fields = self.parse_fields(fields)
+
+        sort_params = self.parse_sort(sort)
+        pagination = PaginationParams(
+            page=page, page_size=page_size, cursor=cursor, count=count
+        )
+        digest = request_digest(
+            filters.cache_key(),
+            [(param.field.value, param.direction.value) for param in sort_params],
+            pagination.model_dump(),
+            selected_fields,
+        )
+        version = await dataset_version.current()
+        encoding = negotiate_encoding(accept_encoding)
+        etag = encoded_etag = None
+        if dataset_version.shared:
+            etag = entity_tag(version, digest)
+            encoded_etag = entity_tag(version, digest, encoding)
+            # the client holds either the plain or the encoded body.
+            matched = matching_etag(if_none_match, etag, encoded_etag)
+            if matched:
+                return CachedBody(etag=matched)
+
+        cache_enabled = settings.RESPONSE_CACHE_ENABLED
+        if cache_enabled and encoding:
+            # encoded bodies are cached too, so hits are not compressed again.
+            body = await response_cache.get(
+                response_cache.key(version, digest, encoding)
+            )
+            if body is not None:
+                return CachedBody(etag=encoded_etag, body=body, encoding=encoding)
+        body = None
+        fresh = True
+        if cache_enabled:
+            body = await response_cache.get(response_cache.key(version, digest))
+        if body is None:
+            async with sessionmanager.read_session() as session:
+                response = await ContentService(session).get_content(
+                    filter_params=filters,
+                    sort_params=sort_params,
+                    pagination=pagination,
+                    fields=selected_fields,
+                )
+                fresh = sessionmanager.is_fresh(session)
+            body = orjson.dumps(response)
+            if not fresh:
+                # a lagging replica may miss rows of this version, the body is
+                # neither cached nor validated under it.
+                etag = encoded_etag = None
+            elif cache_enabled:
+                await response_cache.set(response_cache.key(version, digest), body)
+
+        if not encoding or not should_compress(body):
+            return CachedBody(etag=etag, body=body)
+        body = compress(body, encoding)
+        if cache_enabled and fresh:
+            await response_cache.set(
+                response_cache.key(version, digest, encoding), body
+            )
+        return CachedBody(etag=encoded_etag, body=body, encoding=encoding)
+
+    async def get_content_item(self, content_id: int, fields: str = None) -> bytes:
+        response = await self.content_service.get_content_by_ids(
+            [content_id], self.parse_fields(fields)
+        )
+        if not response["data"]:
+            raise HTTPException(status_code=404, detail="Content not found")
+        return orjson.dumps(response["data"][0])
+
+    async def get_content_batch(self, ids: list[int], fields: str = None) -> bytes:
+        response = await self.content_service.get_content_by_ids(
+            ids, self.parse_fields(fields)
+        )
+        return orjson.dumps(response)
+
+    def export_content(
+        self,
+        year: str,
+        language: str,
+        sort: str,
+        export_format: ExportFormat,
+        fields: str = None,
+        q: str = None,
+    ) -> AsyncIterator[bytes]:
+        # parameters are checked before the response starts, errors can still be 400.
+        filters = ContentFilterParams(year=year, language=language, q=q)
+        sort_params = self.parse_sort(sort)
+        selected_fields = self.parse_fields(fields) or RESPONSE_FIELDS
+        return stream_export(filters, sort_params, selected_fields, export_format)
+
+    async def get_stats(self, year: str, language: str, group_by: str = None) -> dict:
         filters = ContentFilterParams(year=year, language=language)
+        return await self.content_service.get_stats(
+            filters, self.parse_group_by(group_by)
+        )
+
+    def parse_group_by(self, group_by: str) -> list[StatsGroup]:
+        """Return the requested groups in request order, none for the overall totals."""
+        groups: list[StatsGroup] = []
+        for name in (group_by or "").split(","):
+            name = name.strip()
+            if not name:
+                continue
+            try:
+                group = StatsGroup(name)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400, detail=f"Unknown group_by: {name}"
+                )
+            if group not in groups:
+                groups.append(group)
+        return groups
 
+    def parse_sort(self, sort: str) -> list[ContentSortParams]:
         sort_params: list[ContentSortParams] = []
         if sort:
             sort_by = sort.split(",")
@@ -32,17 +183,38 @@ class ContentController:
             for sort in sort_by:
                 field, *direction = sort.split(":")
                 direction = direction[0] if direction else SortDirection.ASC
-                sort_param = ContentSortParams(field=field, direction=direction)
+                try:
+                    sort_param = ContentSortParams(field=field, direction=direction)
+                except ValidationError:
+                    raise HTTPException(status_code=400, detail=f"Invalid sort: {sort}")
                 sort_params.append(sort_param)
+        return sort_params
 
-        return await self.content_service.get_content(
-            filter_params=filters,
-            sort_params=sort_params,
-            pagination=PaginationParams(page=page, page_size=page_size),
-        )
+    def parse_fields(self, fields: str) -> list[str] | None:
+        """Return the requested ContentResponse fields, in response order.
 
-    async def upload_content(self, csv_file: UploadFile):
+        rating is accepted for vote_average, as in sort. None selects every field.
+        """
+        if not fields:
+            return None
+        # vote_average field is exposed as rating in the API.
+        field_map = {"rating": "vote_average"}
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        requested = {field_map.get(name, name) for name in requested}
+        unknown = requested - set(RESPONSE_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+        return [name for name in RESPONSE_FIELDS if name in requested]
+
+    async def upload_content(self, csv_file: UploadFile) -> UploadJob:
         validate_csv_file(csv_file)
-        contents = await csv_file.read()
-        csv_buffer = io.StringIO(contents.decode("utf-8"))
-        await self.content_service.create_content(csv_buffer)
+        return await upload_jobs.submit(csv_file)
+
+    def get_upload_job(self, job_id: str) -> UploadJob:
+        job = upload_jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Upload job not found")
+        return job
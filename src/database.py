@@ -1,30 +1,192 @@
+import asyncio
 import contextlib
-from typing import Any, AsyncIterator
+import logging
+import math
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from src.cache import dataset_version
 from src.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection.
+
+    The wait includes opening a new connection when the pool has to, and the
+    pre-ping of a reused one.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connections_opened = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def _create_connection(self):
+        self.connections_opened += 1
+        return super()._create_connection()
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connections_opened": self.connections_opened,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "wait_seconds_avg": (
+                round(self.wait_seconds_total / self.checkouts, 6)
+                if self.checkouts
+                else 0.0
+            ),
+        }
+
+
+def engine_options() -> dict[str, Any]:
+    """Engine and asyncpg connection arguments from the DB_* settings."""
+    connect_args = {
+        # asyncpg's cache, and the one of SQLAlchemy's asyncpg dialect.
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_COMMAND_TIMEOUT:
+        connect_args["command_timeout"] = settings.DB_COMMAND_TIMEOUT
+    return {
+        "echo": settings.ECHO_SQL,
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
 
 class DatabaseSessionManager:
-    def __init__(self, host: str, engine_kwargs: dict[str, Any] = {}):
+    """Sessions on the primary database, and on an optional read replica.
+
+    Reads go to the replica unless it failed to connect within the last
+    replica_retry_seconds, or a write was made within the last
+    read_your_writes_seconds, then they go to the primary. last_write returns
+    the wall clock time of the last write, by any worker process when it is
+    kept in a shared cache backend.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        engine_kwargs: dict[str, Any] = {},
+        read_host: Optional[str] = None,
+        read_your_writes_seconds: float = 0,
+        replica_retry_seconds: float = 30,
+        last_write: Optional[Callable[[], Awaitable[float]]] = None,
+    ):
         self._engine = create_async_engine(host, **engine_kwargs)
         self._sessionmaker = async_sessionmaker(
             autocommit=False, bind=self._engine, expire_on_commit=False
         )
+        self._read_engine = None
+        self._read_sessionmaker = None
+        if read_host:
+            self._read_engine = create_async_engine(read_host, **engine_kwargs)
+            self._read_sessionmaker = async_sessionmaker(
+                autocommit=False, bind=self._read_engine, expire_on_commit=False
+            )
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.replica_retry_seconds = replica_retry_seconds
+        self._last_write = last_write
+        self._replica_down_until = -math.inf
 
     async def close(self):
         if self._engine is None:
             raise Exception("DatabaseSessionManager is not initialized")
         await self._engine.dispose()
+        if self._read_engine is not None:
+            await self._read_engine.dispose()
 
         self._engine = None
         self._sessionmaker = None
+        self._read_engine = None
+        self._read_sessionmaker = None
+
+    async def prewarm(self, connections: int):
+        """Open connections up front so the first requests do not pay for them."""
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        await prewarm_engine(self._engine, connections)
+        if self._read_engine is not None:
+            try:
+                await prewarm_engine(self._read_engine, connections)
+            except Exception:
+                self.replica_failed()
+
+    def pool_stats(self) -> dict:
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        stats = {"primary": engine_pool_stats(self._engine)}
+        if self._read_engine is not None:
+            stats["replica"] = engine_pool_stats(self._read_engine)
+        return stats
+
+    def engines(self) -> dict[str, AsyncEngine]:
+        engines = {"primary": self._engine}
+        if self._read_engine is not None:
+            engines["replica"] = self._read_engine
+        return engines
+
+    def replica_failed(self):
+        logger.warning("Read replica unavailable, using the primary", exc_info=True)
+        self._replica_down_until = time.monotonic() + self.replica_retry_seconds
+
+    async def use_replica(self) -> bool:
+        if self._read_sessionmaker is None:
+            return False
+        if time.monotonic() < self._replica_down_until:
+            return False
+        if self.read_your_writes_seconds <= 0 or self._last_write is None:
+            return True
+        return time.time() - await self._last_write() >= self.read_your_writes_seconds
+
+    def is_fresh(self, session: AsyncSession) -> bool:
+        """Whether the reads of a session see every committed write.
+
+        Replica reads are only trusted with a read_your_writes_seconds window,
+        which is set above the replica lag.
+        """
+        return not session.info.get("replica") or self.read_your_writes_seconds > 0
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
@@ -52,12 +214,67 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    @contextlib.asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        """Session for queries that only read, see the class docstring."""
+        if self._sessionmaker is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        session = None
+        if await self.use_replica():
+            session = self._read_sessionmaker()
+            try:
+                # connect now, so an unreachable replica can fall back to the primary.
+                await session.connection()
+            except Exception:
+                # asyncpg connect errors are not wrapped, any of them means down.
+                self.replica_failed()
+                await session.close()
+                session = None
+            else:
+                session.info["replica"] = True
+        if session is None:
+            session = self._sessionmaker()
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+async def prewarm_engine(engine: AsyncEngine, connections: int):
+    # held open together, otherwise the pool would hand out the same one.
+    opened = await asyncio.gather(
+        *(engine.connect().start() for _ in range(connections))
+    )
+    for connection in opened:
+        await connection.close()
+
+
+def engine_pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    if isinstance(pool, InstrumentedPool):
+        return pool.stats()
+    return {"status": pool.status()}
+
 
 sessionmanager = DatabaseSessionManager(
-    settings.DATABASE_URL, {"echo": settings.ECHO_SQL}
+    settings.DATABASE_URL,
+    engine_options(),
+    read_host=settings.DATABASE_READ_URL,
+    read_your_writes_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    replica_retry_seconds=settings.READ_REPLICA_RETRY_SECONDS,
+    last_write=dataset_version.last_write,
 )
 
 
 async def get_db_session():
     async with sessionmanager.session() as session:
         yield session
+
+
+async def get_read_session():
+    async with sessionmanager.read_session() as session:
+        yield session
@@ -0,0 +1,92 @@
+"""ETags, Cache-Control and compression of GET /content responses."""
+
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Response
+
+from src.config import settings
+
+try:
+    import brotli
+except ImportError:
+    # optional, responses are only gzip encoded without it.
+    brotli = None
+
+GZIP_LEVEL = 6
+# brotli's default quality 11 is too slow to run per response.
+BROTLI_QUALITY = 5
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Return "br" or "gzip", whichever the client accepts with the higher q."""
+    accepted = {}
+    for item in (accept_encoding or "").split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    ranked = [(accepted.get(name, wildcard), name) for name in offered]
+    quality, name = max(ranked, key=lambda item: item[0])
+    return name if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def should_compress(body: bytes) -> bool:
+    threshold = settings.RESPONSE_COMPRESSION_MIN_BYTES
+    return threshold is not None and len(body) >= threshold
+
+
+def entity_tag(
+    version: int, request_digest: str, encoding: Optional[str] = None
+) -> str:
+    """Strong ETag of a response, per dataset version, request and encoding."""
+    digest = hashlib.sha1(f"{version}:{request_digest}".encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}-{encoding}"' if encoding else f'"{digest[:20]}"'
+
+
+def matching_etag(if_none_match: Optional[str], *etags: str) -> Optional[str]:
+    """The one of etags listed in If-None-Match, compared weakly as RFC 9110 asks."""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etags[0]
+    listed = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return next((etag for etag in etags if etag in listed), None)
+
+
+@dataclass
+class CachedBody:
+    """A serialized response and its validator, body is None when not modified."""
+
+    etag: Optional[str] = None
+    body: Optional[bytes] = None
+    encoding: Optional[str] = None
+
+    def response(self, media_type: str = "application/json") -> Response:
+        headers = {
+            "Cache-Control": settings.HTTP_CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if self.etag:
+            headers["ETag"] = self.etag
+        if self.body is None:
+            return Response(status_code=304, headers=headers)
+        if self.encoding:
+            headers["Content-Encoding"] = self.encoding
+        return Response(content=self.body, media_type=media_type, headers=headers)
@@ -0,0 +1,226 @@
+import bisect
+import contextlib
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings
+
+# seconds, from a cached page to a large upload chunk.
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# call site of the queries run in the current task, set with tag_queries.
+query_tag: ContextVar[str] = ContextVar("query_tag", default="other")
+
+# (metric name, type, help, [(labels, value)]) produced when /metrics is scraped.
+Sample = Tuple[str, str, str, Iterable[Tuple[Dict[str, str], float]]]
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"'.replace("\n", "\\n"))
+    return "{" + ",".join(pairs) + "}"
+
+
+class Histogram:
+    """Prometheus histogram with a fixed set of label names."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Tuple[str, ...],
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> (per bucket counts, the last one is +Inf, sum).
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0])
+            self._series[label_values] = series
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = dict(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket_labels = format_labels({**labels, "le": str(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {total[0]}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """Process-wide registry rendered in the Prometheus text format.
+
+    Nothing is recorded when disabled: the middleware and engine listeners are
+    not installed and the stage timers only read the flag.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.request_seconds = Histogram(
+            "content_http_request_duration_seconds",
+            "Latency of HTTP requests by route.",
+            ("method", "route", "status"),
+        )
+        self.query_seconds = Histogram(
+            "content_db_query_duration_seconds",
+            "Duration of SQL statements by call site.",
+            ("tag", "database"),
+        )
+        self.upload_stage_seconds = Histogram(
+            "content_upload_stage_duration_seconds",
+            "Duration of upload stages, per chunk.",
+            ("stage",),
+        )
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """Register a callable that reports current values when scraped."""
+        self._collectors.append(collector)
+
+    def observe_upload_stages(self, timings: Dict[str, float]):
+        if self.enabled:
+            for stage, seconds in timings.items():
+                self.upload_stage_seconds.observe(seconds, stage)
+
+    @contextlib.contextmanager
+    def upload_stage(self, stage: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.upload_stage_seconds.observe(time.perf_counter() - started, stage)
+
+    def instrument_engine(self, engine: AsyncEngine, database: str):
+        """Time every statement run on the engine, tagged with query_tag."""
+        sync_engine = engine.sync_engine
+
+        # the start time is kept on the execution context, so a statement that
+        # raises leaves nothing behind on the pooled connection.
+        def observe(context):
+            started = context.__dict__.pop("query_started", None)
+            if started is not None:
+                self.query_seconds.observe(
+                    time.perf_counter() - started, query_tag.get(), database
+                )
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, params, context, many):
+            if context is not None:
+                context.query_started = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, params, context, many):
+            if context is not None:
+                observe(context)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def handle_error(exception_context):
+            # failed statements are timed too, after_cursor_execute is skipped.
+            if exception_context.execution_context is not None:
+                observe(exception_context.execution_context)
+
+    def render(self) -> str:
+        lines = [
+            *self.request_seconds.render(),
+            *self.query_seconds.render(),
+            *self.upload_stage_seconds.render(),
+        ]
+        for collector in self._collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency of every HTTP request.
+
+    Requests are labelled with the path template of the matched route, so
+    /content/upload/{job_id} is a single series.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the router sets the matched route on the scope.
+            route = scope.get("route")
+            metrics.request_seconds.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+            )
+
+
+@contextlib.contextmanager
+def tag_queries(tag: str) -> Iterator[None]:
+    """Tag the queries run inside the block, for content_db_query_duration_seconds."""
+    token = query_tag.set(tag)
+    try:
+        yield
+    finally:
+        query_tag.reset(token)
+
+
+metrics = Metrics(settings.METRICS_ENABLED)
@@ -1,18 +1,77 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import field_serializer
+from sqlalchemy import Column, Computed, Index, Integer, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlmodel import Field, SQLModel
 
 from src.models.timestamp_mixin import TimestampMixin
 
 
-class ContentLanguage(SQLModel, table=True):
-    content_id: Optional[int] = Field(default=None, primary_key=True)
-    language_id: Optional[int] = Field(default=None, primary_key=True)
+# text search configuration of search_vector, queries must use the same one.
+SEARCH_CONFIG = "english"
+# titles rank above the overview.
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(original_title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(overview, '')), 'B')"
+)
 
 
 class Content(TimestampMixin, table=True):
+    # sort and year filter shapes of GET /content, id keeps the order total.
+    # partial, soft deleted rows are never listed.
+    __table_args__ = (
+        Index(
+            "ix_content_release_date_id_active",
+            "release_date",
+            "id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        Index(
+            "ix_content_vote_average_id_active",
+            "vote_average",
+            "id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        Index(
+            "ix_content_release_date_vote_average_id_active",
+            "release_date",
+            "vote_average",
+            "id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        Index(
+            "ix_content_vote_average_release_date_id_active",
+            "vote_average",
+            "release_date",
+            "id",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        # language filter of GET /content, an overlap (&&) with the requested ids.
+        Index(
+            "ix_content_language_ids_active",
+            "language_ids",
+            postgresql_using="gin",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        # q searches of GET /content.
+        Index(
+            "ix_content_search_vector_active",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=text("is_deleted = false"),
+        ),
+        # identity of a row for upload upserts, see ingest.content_keys.
+        Index(
+            "ux_content_content_key_active",
+            "content_key",
+            unique=True,
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     budget: float = Field(default=0.0)
     revenue: float = Field(default=0.0)
@@ -24,6 +83,11 @@ class Content(TimestampMixin, table=True):
     original_title: str
     title: str
     languages: Optional[str] = Field(default="[]")
+    # sorted ids of the languages parsed from languages.
+    language_ids: List[int] = Field(
+        default_factory=list,
+        sa_column=Column(ARRAY(Integer), nullable=False, server_default="{}"),
+    )
     overview: Optional[str] = Field(default=None)
     # cast date string in yyyy-mm-dd format to date
     release_date: date
@@ -31,6 +95,13 @@ class Content(TimestampMixin, table=True):
     vote_count: int = Field(default=0)
     production_company_id: int
     genre_id: int
+    # md5 of title, original_title, release_date and production_company_id.
+    content_key: str = Field(max_length=32)
+    # generated by the database from title, original_title and overview.
+    search_vector: Optional[str] = Field(
+        default=None,
+        sa_column=Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True)),
+    )
     is_deleted: bool = False
 
     @field_serializer("release_date", check_fields=False)
@@ -48,5 +119,27 @@ class Content(TimestampMixin, table=True):
 
 
 class Language(TimestampMixin, table=True):
+    # language names are matched case insensitively.
+    __table_args__ = (Index("ix_language_lower_name", text("lower(name)")),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(unique=True)
+
+
+# language_id of the ContentStats rows that count every content once.
+ALL_LANGUAGES = 0
+
+
+class ContentStats(SQLModel, table=True):
+    """Aggregates of active content per language, release year and genre.
+
+    Rows of ALL_LANGUAGES count each content once, the other rows once per
+    language of the content. Kept up to date by uploads, see StatsService.
+    """
+
+    language_id: int = Field(primary_key=True)
+    year: int = Field(primary_key=True)
+    genre_id: int = Field(primary_key=True)
+    content_count: int = Field(default=0)
+    vote_average_sum: float = Field(default=0.0)
+    revenue_sum: float = Field(default=0.0)
@@ -0,0 +1,17 @@
+from typing import Optional
+
+from sqlmodel import Field
+
+from src.models.timestamp_mixin import TimestampMixin
+
+
+class Upload(TimestampMixin, table=True):
+    """A csv file that was fully ingested, identified by its sha256."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    checksum: str = Field(max_length=64, unique=True)
+    filename: str
+    rows: int = Field(default=0)
+    rows_inserted: int = Field(default=0)
+    rows_updated: int = Field(default=0)
+    rows_unchanged: int = Field(default=0)
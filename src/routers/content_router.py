@@ -1,46 +1,182 @@
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import APIRouter, Depends, File, Query, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    Path,
+    Query,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.controllers.content_controller import ContentController
-from src.database import get_db_session
-from src.schema.content_response import ContentResponse
-from src.schema.query_params import ContentListResponse
+from src.database import get_read_session
+from src.schema.content_response import ContentBatchResponse, ContentItemResponse
+from src.schema.query_params import (
+    ContentBatchRequest,
+    ContentListResponse,
+    CountMode,
+    ExportFormat,
+    MAX_CONTENT_ID,
+)
+from src.schema.stats_response import ContentStatsResponse
+from src.schema.upload_response import UploadJobResponse
 from src.services.content_service import ContentService
+from src.services.export import MEDIA_TYPES
 
 router = APIRouter()
 
 
 @router.post(
     "/content/upload",
-    response_model=List[ContentResponse],
-    status_code=201,
+    response_model=UploadJobResponse,
+    status_code=202,
 )
-async def upload_csv(
-    file: UploadFile = File(...), session: AsyncSession = Depends(get_db_session)
-):
-    content_service = ContentService(session)
-    await ContentController(content_service).upload_content(file)
-    return JSONResponse({"message": "File uploaded successfully"}, status_code=201)
+async def upload_csv(file: UploadFile = File(...)):
+    job = await ContentController().upload_content(file)
+    return job.to_response()
+
+
+@router.get("/content/upload/{job_id}", response_model=UploadJobResponse)
+async def get_upload_job(job_id: str):
+    job = ContentController().get_upload_job(job_id)
+    return job.to_response()
 
 
 @router.get("/content", response_model=ContentListResponse)
 async def list_content(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    year: Optional[str] = Query(None, description="Year filter (YYYY or YYYY-YYYY)"),
+    year: Optional[str] = Query(
+        None,
+        pattern=r"^[12]\d{3}(-[12]\d{3})?$",
+        description="Year filter (YYYY or YYYY-YYYY)",
+    ),
     language: Optional[str] = Query(
         None, description="Language filter (comma-separated)"
     ),
     sort: Optional[str] = Query(
         None, description="Sort field:direction (e.g., release_date:desc)"
     ),
-    session: AsyncSession = Depends(get_db_session),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page, replaces page"
+    ),
+    count: CountMode = Query(
+        CountMode.EXACT, description="total_items strategy: exact, cached or estimate"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated response fields (e.g., title,rating)"
+    ),
+    q: Optional[str] = Query(
+        None,
+        max_length=200,
+        description="Full-text search over title, original title and overview",
+    ),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    # no session dependency, the controller opens one unless the ETag matches.
+    page = await ContentController().get_content(
+        year,
+        language,
+        sort,
+        page,
+        page_size,
+        cursor,
+        count,
+        fields,
+        q,
+        if_none_match,
+        accept_encoding,
+    )
+    # the body is already serialized (and possibly cached), skip response_model.
+    return page.response()
+
+
+@router.get("/content/stats", response_model=ContentStatsResponse)
+async def content_stats(
+    year: Optional[str] = Query(
+        None,
+        pattern=r"^[12]\d{3}(-[12]\d{3})?$",
+        description="Year filter (YYYY or YYYY-YYYY)",
+    ),
+    language: Optional[str] = Query(
+        None, description="Language filter (comma-separated)"
+    ),
+    group_by: Optional[str] = Query(
+        None, description="Comma-separated groups: year, language, genre"
+    ),
+    session: AsyncSession = Depends(get_read_session),
+):
+    content_service = ContentService(session)
+    return await ContentController(content_service).get_stats(year, language, group_by)
+
+
+@router.get("/content/export", response_class=StreamingResponse)
+async def export_content(
+    year: Optional[str] = Query(
+        None,
+        pattern=r"^[12]\d{3}(-[12]\d{3})?$",
+        description="Year filter (YYYY or YYYY-YYYY)",
+    ),
+    language: Optional[str] = Query(
+        None, description="Language filter (comma-separated)"
+    ),
+    sort: Optional[str] = Query(
+        None, description="Sort field:direction (e.g., release_date:desc)"
+    ),
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated response fields (e.g., title,rating)"
+    ),
+    q: Optional[str] = Query(
+        None,
+        max_length=200,
+        description="Full-text search over title, original title and overview",
+    ),
+):
+    stream = ContentController().export_content(
+        year, language, sort, format, fields, q
+    )
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="content.{format.value}"'
+        },
+    )
+
+
+@router.post("/content/batch", response_model=ContentBatchResponse)
+async def batch_content(
+    batch: ContentBatchRequest,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated response fields (e.g., title,rating)"
+    ),
+    session: AsyncSession = Depends(get_read_session),
+):
+    content_service = ContentService(session)
+    body = await ContentController(content_service).get_content_batch(
+        batch.ids, fields
+    )
+    return Response(content=body, media_type="application/json")
+
+
+# after the other GET /content/... routes, their paths are not ids.
+@router.get("/content/{content_id}", response_model=ContentItemResponse)
+async def get_content_item(
+    content_id: int = Path(..., ge=1, le=MAX_CONTENT_ID),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated response fields (e.g., title,rating)"
+    ),
+    session: AsyncSession = Depends(get_read_session),
 ):
     content_service = ContentService(session)
-    response = await ContentController(content_service).get_content(
-        year, language, sort, page, page_size
+    body = await ContentController(content_service).get_content_item(
+        content_id, fields
     )
-    return response
+    return Response(content=body, media_type="application/json")
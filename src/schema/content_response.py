@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -21,3 +21,14 @@ class ContentResponse(BaseModel):
     genre_id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ContentItemResponse(ContentResponse):
+    id: int
+
+
+class ContentBatchResponse(BaseModel):
+    # found items, in request order.
+    data: List[ContentItemResponse]
+    # requested ids that do not exist or are deleted, in request order.
+    missing: List[int]
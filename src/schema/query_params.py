@@ -2,10 +2,14 @@ import urllib.parse
 from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conint
 
+from src.config import settings
 from src.schema.content_response import ContentResponse
 
+# content.id is an int4, larger ids cannot exist and would fail in the query.
+MAX_CONTENT_ID = 2**31 - 1
+
 
 class SortField(str, Enum):
     RELEASE_DATE = "release_date"
@@ -17,9 +21,33 @@ class SortDirection(str, Enum):
     DESC = "desc"
 
 
+class CountMode(str, Enum):
+    # count(*) over the filtered rows.
+    EXACT = "exact"
+    # exact count, memoized per filter until the next upload.
+    CACHED = "cached"
+    # planner row estimate, no rows are scanned.
+    ESTIMATE = "estimate"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class StatsGroup(str, Enum):
+    YEAR = "year"
+    LANGUAGE = "language"
+    GENRE = "genre"
+
+
 class PaginationParams(BaseModel):
     page: int = Field(1, ge=1, description="Page number")
     page_size: int = Field(20, ge=1, le=100, description="Items per page")
+    cursor: Optional[str] = Field(
+        None, description="next_cursor of the previous page, replaces page"
+    )
+    count: CountMode = Field(CountMode.EXACT, description="total_items strategy")
 
 
 class PaginationResponse(BaseModel):
@@ -27,6 +55,10 @@ class PaginationResponse(BaseModel):
     page_size: int
     total_items: int
     total_pages: int
+    # strategy that produced total_items, a cached count miss reports exact.
+    count_mode: CountMode = CountMode.EXACT
+    # cursor of the next page, None on the last page.
+    next_cursor: Optional[str] = None
 
 
 class ContentListResponse(BaseModel):
@@ -34,11 +66,23 @@ class ContentListResponse(BaseModel):
     pagination: PaginationResponse
 
 
+class ContentBatchRequest(BaseModel):
+    ids: List[conint(ge=1, le=MAX_CONTENT_ID)] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_IDS,
+        description="Content ids, in response order",
+    )
+
+
 class ContentFilterParams(BaseModel):
     year: Optional[str] = Field(
         None, description="Single year (YYYY) or range (YYYY-YYYY)"
     )
     language: Optional[str] = Field(None, description="Comma-separated languages")
+    q: Optional[str] = Field(
+        None, description="Full-text search over titles and overview"
+    )
 
     def to_dict(self):
         filters = {}
@@ -54,8 +98,19 @@ class ContentFilterParams(BaseModel):
                 urllib.parse.unquote(lang.strip()) for lang in self.language.split(",")
             ]
 
+        search = " ".join((self.q or "").split())
+        if search:
+            filters["search"] = search
+
         return filters
 
+    def cache_key(self) -> tuple:
+        """Normalized filters, equal for requests that select the same rows."""
+        filters = self.to_dict()
+        year = filters.get("year_range") or (filters.get("year"),) * 2
+        languages = sorted({lang.lower() for lang in filters.get("languages", [])})
+        return (year, tuple(languages), filters.get("search"))
+
 
 class ContentSortParams(BaseModel):
     field: SortField
@@ -0,0 +1,30 @@
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from src.schema.query_params import StatsGroup
+
+
+class StatsSource(str, Enum):
+    # read from the contentstats summary table.
+    SUMMARY = "summary"
+    # aggregated over content, for filters the summary cannot answer exactly.
+    CONTENT = "content"
+
+
+class ContentStatsRow(BaseModel):
+    # set for the grouped dimensions only.
+    year: Optional[int] = None
+    language: Optional[str] = None
+    genre_id: Optional[int] = None
+    count: int
+    # None when the group is empty.
+    average_rating: Optional[float] = None
+    total_revenue: float
+
+
+class ContentStatsResponse(BaseModel):
+    group_by: List[StatsGroup]
+    source: StatsSource
+    data: List[ContentStatsRow]
@@ -0,0 +1,36 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class UploadJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class UploadJobResponse(BaseModel):
+    job_id: str
+    filename: str
+    status: UploadJobStatus
+    completed: bool
+    # sha256 of the file, an earlier upload of the same file is skipped.
+    checksum: str
+    skipped: bool
+    rows_parsed: int
+    # rows_parsed is split into new rows, changed rows, rows equal to the
+    # stored ones and rows repeated later in the same file.
+    rows_inserted: int
+    rows_updated: int
+    rows_unchanged: int
+    rows_duplicate: int
+    # csv rows per chunk, in file order.
+    rows_per_chunk: List[int]
+    rows_per_second: float
+    errors: List[str]
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
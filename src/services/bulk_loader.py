@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Dict, List
+
+from sqlalchemy import column, false, func, literal_column, table, tuple_
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlmodel import text
+
+from src.models.content import Content
+from src.services.ingest import CONTENT_FIELDS, ParsedChunk
+
+# the parsed fields, and the language ids resolved while loading.
+LOADED_FIELDS = CONTENT_FIELDS + ["language_ids"]
+# fields compared, and overwritten, when an uploaded row matches an existing one.
+UPDATED_FIELDS = [name for name in LOADED_FIELDS if name != "content_key"]
+# per connection temporary table the copy loader stages chunks in.
+STAGING_TABLE = "content_staging"
+# rows per INSERT statement of the insert loader, asyncpg allows 32767 parameters.
+INSERT_BATCH_ROWS = 1000
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def add(self, rows, total: int):
+        """Count the (inserted,) rows returned for total rows."""
+        inserted = sum(1 for (row_inserted,) in rows if row_inserted)
+        self.inserted += inserted
+        self.updated += len(rows) - inserted
+        self.unchanged += total - len(rows)
+
+
+def upsert_content(statement: Insert) -> Insert:
+    """Make an insert into content update the active row with the same content_key.
+
+    Rows whose fields are all unchanged are not written, and only the written
+    rows are returned, as (inserted,).
+    """
+    excluded = statement.excluded
+    columns = Content.__table__.c
+    return statement.on_conflict_do_update(
+        index_elements=[columns.content_key],
+        index_where=columns.is_deleted == false(),
+        set_={
+            **{name: excluded[name] for name in UPDATED_FIELDS},
+            "updated_at": func.now(),
+        },
+        where=tuple_(*[columns[name] for name in UPDATED_FIELDS]).is_distinct_from(
+            tuple_(*[excluded[name] for name in UPDATED_FIELDS])
+        ),
+    ).returning(literal_column("xmax = 0"))
+
+
+class BulkLoader:
+    """Upsert parsed chunks into content.
+
+    Rows are matched on content_key, and get the ids of their languages in
+    language_ids. The caller owns the transaction.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def driver_connection(self):
+        """Return the asyncpg connection bound to the session's transaction."""
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        return raw_connection.driver_connection
+
+    async def copy(self, chunk: ParsedChunk, lang_map: dict[str, int]) -> UpsertResult:
+        """COPY the chunk into a staging table and upsert it with one statement."""
+        result = UpsertResult()
+        if not len(chunk):
+            return result
+        # emptied on commit and kept for the next chunk on the same connection.
+        await self.session.execute(
+            text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+                f"ON COMMIT DELETE ROWS AS SELECT {', '.join(LOADED_FIELDS)} "
+                "FROM content WITH NO DATA"
+            )
+        )
+        connection = await self.driver_connection()
+        await connection.copy_records_to_table(
+            STAGING_TABLE, records=self.records(chunk, lang_map), columns=LOADED_FIELDS
+        )
+
+        staging = table(STAGING_TABLE, *[column(name) for name in LOADED_FIELDS])
+        statement = upsert_content(
+            insert(Content).from_select(LOADED_FIELDS, select(*staging.c))
+        )
+        rows = await self.session.execute(statement)
+        result.add(rows.all(), len(chunk))
+        return result
+
+    async def insert(
+        self, chunk: ParsedChunk, lang_map: dict[str, int]
+    ) -> UpsertResult:
+        """Upsert the chunk with multi-row INSERT statements of INSERT_BATCH_ROWS."""
+        result = UpsertResult()
+        rows = [dict(zip(LOADED_FIELDS, row)) for row in self.records(chunk, lang_map)]
+        for start in range(0, len(rows), INSERT_BATCH_ROWS):
+            batch = rows[start : start + INSERT_BATCH_ROWS]
+            returned = await self.session.execute(
+                upsert_content(insert(Content).values(batch))
+            )
+            result.add(returned.all(), len(batch))
+        return result
+
+    def records(self, chunk: ParsedChunk, lang_map: dict[str, int]) -> List[tuple]:
+        """Rows of the chunk as tuples in LOADED_FIELDS order."""
+        language_ids: Dict[int, set] = {}
+        for row, name in zip(chunk.language_rows, chunk.language_values):
+            language_ids.setdefault(row, set()).add(lang_map[name])
+        return [
+            (*values, sorted(language_ids.get(row, ())))
+            for row, values in enumerate(chunk.rows())
+        ]
@@ -1,190 +1,509 @@
+import asyncio
 import math
-from io import StringIO
-from typing import List, Tuple
+from collections import deque
+from datetime import date
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Sequence, Tuple
 
-import pandas as pd
-from sqlalchemy import func
+from fastapi import HTTPException
+from sqlalchemy import (
+    Float,
+    Integer,
+    Select,
+    any_,
+    bindparam,
+    false,
+    func,
+    literal_column,
+    or_,
+    tuple_,
+)
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlmodel import and_, text
+from sqlmodel import and_
 
-from src.models.content import Content, ContentLanguage, Language
+from src.cache import count_cache, dataset_version
+from src.config import settings
+from src.metrics import metrics, tag_queries
+from src.models.content import SEARCH_CONFIG, Content
 from src.schema.query_params import (
     ContentFilterParams,
-    ContentListResponse,
     ContentResponse,
     ContentSortParams,
+    CountMode,
     PaginationParams,
-    PaginationResponse,
     SortDirection,
+    StatsGroup,
+)
+from src.schema.stats_response import StatsSource
+from src.services.bulk_loader import BulkLoader, UpsertResult
+from src.services.ingest import (
+    ParsedChunk,
+    get_executor,
+    parse_range,
+    split_row_ranges,
 )
-from src.utils import parse_date, parse_languages
+from src.services.language_cache import language_cache
+from src.services.stats_service import StatsService, stats_row
+from src.utils import decode_cursor, encode_cursor
 
+if TYPE_CHECKING:
+    from src.services.upload_jobs import UploadJob
 
-class ContentService:
-    def __init__(self, session: AsyncSession) -> None:
-        self.session = session
+# fields of GET /content, in ContentResponse order.
+RESPONSE_FIELDS = list(ContentResponse.model_fields)
 
-    async def update_languages(self, languages_df: pd.DataFrame):
-        languages: list[str] = languages_df.to_list()
-        unique_languages = set()
-        for lang in languages:
-            unique_languages.update(parse_languages(lang))
-        existing_languages = await self.session.execute(
-            select(Language).filter(Language.name.in_(unique_languages))
-        )
-        existing_languages = set(
-            lang.name for lang in existing_languages.scalars().all()
-        )
 
-        content_languages = unique_languages - existing_languages
-        self.session.add_all([Language(name=lang) for lang in content_languages])
-        await self.session.commit()
-
-    def clean_data(self, df: pd.DataFrame):
-        numerical_columns = [
-            "budget",
-            "revenue",
-            "runtime",
-            "vote_average",
-            "vote_count",
-        ]
-        string_columns = [
-            "status",
-            "homepage",
-            "original_language",
-            "original_title",
-            "title",
-            "overview",
-        ]
-        date_columns = ["release_date"]
-        # cleanup missing values
-        df[numerical_columns] = df[numerical_columns].fillna(0)
-        df[string_columns] = df[string_columns].fillna("NA")
-        df[date_columns] = df[date_columns].fillna("1900-01-01")
-        df["languages"] = df["languages"].fillna("[]")
-        return df
-
-    async def get_all_languages(self):
-        result = await self.session.execute(select(Language))
-        return result.scalars().all()
+def search_query(search: str):
+    """tsquery of a q search, quoted phrases, OR and -word are supported."""
+    return func.websearch_to_tsquery(
+        literal_column(f"'{SEARCH_CONFIG}'::regconfig"), search
+    )
+
+
+def search_rank(search: str):
+    return func.ts_rank(Content.search_vector, search_query(search), type_=Float)
+
+
+class ContentService:
+    def __init__(
+        self, session: AsyncSession, loader: str = settings.UPLOAD_LOADER
+    ) -> None:
+        self.session = session
+        self.loader = loader
 
     async def get_content(
         self,
         filter_params: ContentFilterParams = None,
         sort_params: List[ContentSortParams] = [],
         pagination: PaginationParams = PaginationParams(),
-    ):
+        fields: Optional[List[str]] = None,
+    ) -> dict:
+        """Return one page of content as a plain dict, ready to be serialized.
+
+        Only the requested ContentResponse fields, all of them by default, are
+        selected as row tuples, followed by the sort keys the cursor needs.
+        The rows come from the database, so they are not validated through
+        ContentResponse again.
+        """
+        fields = fields or RESPONSE_FIELDS
+        sort_keys = self.get_sort_keys(
+            sort_params, filter_params.to_dict().get("search")
+        )
+        # sort keys that are not requested are selected after the fields.
+        columns = [getattr(Content, name) for name in fields]
+        columns += [
+            column.label(name) for name, column, _ in sort_keys if name not in fields
+        ]
+        positions = {column.key: i for i, column in enumerate(columns)}
+
+        query = await self.filter_query(select(*columns), filter_params)
+        with tag_queries("count"):
+            total, count_mode = await self.count_content(
+                query, filter_params, pagination.count
+            )
+        query = self.order_query(query, sort_keys)
+
+        if pagination.cursor:
+            # keyset pagination, continue after the last row of the previous page.
+            items_query = query.where(self.after_cursor(sort_keys, pagination.cursor))
+        else:
+            # Offset pagination is 1-indexed.
+            items_query = query.offset((pagination.page - 1) * pagination.page_size)
+        # fetch one extra row to know if there is a next page.
+        with tag_queries("page"):
+            rows = await self.session.execute(
+                items_query.limit(pagination.page_size + 1)
+            )
+        rows = rows.all()
+        next_cursor = None
+        if len(rows) > pagination.page_size:
+            rows = rows[: pagination.page_size]
+            next_cursor = encode_cursor(
+                [self.sort_key_name(key) for key in sort_keys],
+                [rows[-1][positions[name]] for name, _, _ in sort_keys],
+            )
+
+        # Last page can have less items.
+        pages: int = math.ceil(total / pagination.page_size)
+
+        # same shape as ContentListResponse, sort keys past the fields are dropped.
+        return {
+            "data": [dict(zip(fields, row)) for row in rows],
+            "pagination": {
+                "current_page": pagination.page,
+                "page_size": pagination.page_size,
+                "total_items": total,
+                "total_pages": pages,
+                "next_cursor": next_cursor,
+                "count_mode": count_mode,
+            },
+        }
+
+    async def get_content_by_ids(
+        self, ids: List[int], fields: Optional[List[str]] = None
+    ) -> dict:
+        """Return the content with these ids, in request order, with a single query.
+
+        Items carry their id and the requested fields. Ids that do not exist,
+        or are soft deleted, are reported in missing. Repeated ids count once.
+        """
+        fields = fields or RESPONSE_FIELDS
+        ids = list(dict.fromkeys(ids))
+        # a single array parameter, however many ids are requested.
+        ids_param = bindparam("ids", ids, type_=postgresql.ARRAY(Integer))
+        query = select(Content.id, *[getattr(Content, name) for name in fields]).where(
+            Content.id == any_(ids_param), Content.is_deleted == false()
+        )
+        with tag_queries("batch"):
+            result = await self.session.execute(query)
+        items = {
+            row[0]: {"id": row[0], **dict(zip(fields, row[1:]))} for row in result
+        }
+        return {
+            "data": [items[content_id] for content_id in ids if content_id in items],
+            "missing": [content_id for content_id in ids if content_id not in items],
+        }
+
+    async def export_content(
+        self,
+        filter_params: ContentFilterParams,
+        sort_params: List[ContentSortParams],
+        fields: List[str],
+        batch_size: int = settings.EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[tuple]]:
+        """Yield every matching row as tuples of fields, batch_size rows at a time.
+
+        Rows are read through a server-side cursor, the next batch is only
+        fetched when the caller asks for it.
+        """
+        query = await self.filter_query(
+            select(*[getattr(Content, name) for name in fields]), filter_params
+        )
+        sort_keys = self.get_sort_keys(
+            sort_params, filter_params.to_dict().get("search")
+        )
+        query = self.order_query(query, sort_keys)
+        with tag_queries("export"):
+            result = await self.session.stream(
+                query.execution_options(yield_per=batch_size)
+            )
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_stats(
+        self, filter_params: ContentFilterParams, group_by: List[StatsGroup]
+    ) -> dict:
+        """Count, average rating and total revenue of the matching content per group.
+
+        Read from the contentstats summary table, except when several languages
+        are filtered on without grouping by language: content in more than one
+        of them would be counted twice there, so content is aggregated instead.
+        """
+        filters = filter_params.to_dict()
+        year = filters.get("year_range") or filters.get("year")
+        if isinstance(year, int):
+            year = (year, year)
+        language_ids = None
+        if filters.get("languages"):
+            with tag_queries("prefilter"):
+                language_ids = await language_cache.resolve(
+                    self.session, filters["languages"]
+                )
+
+        if (
+            language_ids
+            and len(language_ids) > 1
+            and StatsGroup.LANGUAGE not in group_by
+        ):
+            source = StatsSource.CONTENT
+            columns = {
+                StatsGroup.YEAR: func.extract("year", Content.release_date)
+                .cast(Integer)
+                .label("year"),
+                StatsGroup.GENRE: Content.genre_id,
+            }
+            group_columns = [columns[group] for group in group_by]
+            query = await self.filter_query(
+                select(
+                    *group_columns,
+                    func.count(),
+                    func.sum(Content.vote_average),
+                    func.sum(Content.revenue),
+                ).select_from(Content),
+                filter_params,
+            )
+            if group_columns:
+                query = query.group_by(*group_columns).order_by(*group_columns)
+            with tag_queries("stats"):
+                result = await self.session.execute(query)
+            names = [column.key for column in group_columns]
+            data = [
+                stats_row(dict(zip(names, row[: len(names)])), *row[len(names) :])
+                for row in result.all()
+            ]
+        else:
+            source = StatsSource.SUMMARY
+            with tag_queries("stats"):
+                data = await StatsService(self.session).summary(
+                    year, language_ids, group_by
+                )
+        return {"group_by": group_by, "source": source, "data": data}
+
+    async def filter_query(self, query: Select, filter_params: ContentFilterParams):
+        """Apply the filters to a query on Content, soft deleted rows are excluded."""
         filter_params = filter_params.to_dict()
         languages: List[str] = filter_params.get("languages", None)
         year: int | Tuple[int] = filter_params.get("year", None) or filter_params.get(
             "year_range", None
         )
+        search: Optional[str] = filter_params.get("search", None)
 
-        query = select(Content)
+        # matches the predicate of the partial indexes on content.
+        query = query.where(Content.is_deleted == false())
         if languages and len(languages) > 0:
-            languages = [f"'{lang.strip().lower()}'" for lang in languages]
-            sql_query = f"""
-            WITH lang as (SELECT id FROM language where lower(name) in ({','.join(languages)})),
-            cl as (select content_id from contentlanguage cl join lang l on cl.language_id = l.id)
-            select distinct c.id as content_id from content c join cl on c.id = cl.content_id
-            """
-            lang_filtered = await self.session.execute(text(sql_query))
-            lang_filtered = lang_filtered.all()
-            content_ids = [c.content_id for c in lang_filtered]
-            query = query.where(Content.id.in_(content_ids))
+            with tag_queries("prefilter"):
+                language_ids = await language_cache.resolve(self.session, languages)
+            if language_ids:
+                # an overlap, answered by the GIN index on language_ids.
+                requested = postgresql.array(language_ids, type_=Integer)
+                query = query.where(Content.language_ids.op("&&")(requested))
+            else:
+                query = query.where(false())
 
         if year:
-            if isinstance(year, tuple):
-                start_year, end_year = year
-                conditions = []
-                conditions.append(
-                    func.date_part("year", Content.publication_date) <= end_year
-                )
-                conditions.append(
-                    func.date_part("year", Content.publication_date) >= start_year
-                )
-                query = query.where(and_(*conditions))
-            else:
-                query = query.where(
-                    func.date_part("year", Content.release_date) == year
-                )
+            # half-open date ranges, so the release_date indexes can be used.
+            start_year, end_year = year if isinstance(year, tuple) else (year, year)
+            query = query.where(
+                Content.release_date >= date(start_year, 1, 1),
+                Content.release_date < date(end_year + 1, 1, 1),
+            )
+
+        if search:
+            # answered by the GIN index on search_vector.
+            query = query.where(Content.search_vector.op("@@")(search_query(search)))
+        return query
+
+    async def count_content(
+        self, query: Select, filter_params: ContentFilterParams, count_mode: CountMode
+    ) -> Tuple[int, CountMode]:
+        """Count the rows selected by the filtered, unordered query.
+
+        Returns:
+            tuple: The total and the strategy that produced it.
+        """
+        if count_mode == CountMode.ESTIMATE:
+            return await self.estimate_rows(query), CountMode.ESTIMATE
+
+        cache_key = (await dataset_version.current(), filter_params.cache_key())
+        if count_mode == CountMode.CACHED:
+            total = count_cache.get(cache_key)
+            if total is not None:
+                return total, CountMode.CACHED
+
+        # total items can be calculated without a db query but might affect page drift.
+        count_query = select(func.count()).select_from(query.subquery())
+        total = await self.session.scalar(count_query)
+        count_cache.set(cache_key, total)
+        return total, CountMode.EXACT
+
+    async def estimate_rows(self, query: Select) -> int:
+        """Return the planner's row estimate for the query without running it."""
+        # filter values are ids, dates and booleans, and the q search string,
+        # which the literal renderer quotes and escapes. The SQL goes to the
+        # driver as is, text() would read ":word" in a search as a parameter.
+        connection = await self.session.connection()
+        sql = query.compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+        result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+        return int(result.scalar()[0]["Plan"]["Plan Rows"])
+
+    def get_sort_keys(
+        self, sort_params: List[ContentSortParams], search: Optional[str] = None
+    ) -> List[tuple]:
+        """Return (field name, column, direction) for every sort key.
+
+        id is always the last key, in the direction of the previous key, so the
+        order is total and a (key, id) index can be scanned in either direction.
+        Searches without a sort are ordered by rank, best matches first.
+        """
         # vote_average field in db is exposed as rating in the API.
         sort_key_map = {
             "rating": "vote_average",
         }
+        sort_keys = []
         for sort_param in sort_params:
             sort_field = sort_param.field
             sort_direction = sort_param.direction
             if sort_field:
                 sort_field = sort_key_map.get(sort_field.value, sort_field.value)
-                if sort_direction == SortDirection.ASC:
-                    query = query.order_by(getattr(Content, sort_field).asc())
-                else:
-                    query = query.order_by(getattr(Content, sort_field).desc())
-        
-        # total items can be calculated without a db query but might affect page drift.
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.session.scalar(count_query)
+                sort_keys.append(
+                    (sort_field, getattr(Content, sort_field), sort_direction)
+                )
+        if search and not sort_keys:
+            sort_keys.append(("rank", search_rank(search), SortDirection.DESC))
+        id_direction = sort_keys[-1][2] if sort_keys else SortDirection.ASC
+        sort_keys.append(("id", Content.id, id_direction))
+        return sort_keys
 
-        # Offset pagination is 1-indexed.
-        items_query = query.offset((pagination.page - 1) * pagination.page_size).limit(
-            pagination.page_size
-        )
-        items = await self.session.execute(items_query)
-        items = items.scalars().all()
-        items = [ContentResponse.model_validate(item) for item in items]
+    def order_query(self, query: Select, sort_keys: List[tuple]) -> Select:
+        for _, column, direction in sort_keys:
+            if direction == SortDirection.ASC:
+                query = query.order_by(column.asc())
+            else:
+                query = query.order_by(column.desc())
+        return query
 
-        # Last page can have less items.
-        pages: int = math.ceil(total / pagination.page_size)
+    def sort_key_name(self, sort_key: tuple) -> str:
+        name, _, direction = sort_key
+        return f"{name}:{direction.value}"
+
+    def cursor_value(self, name: str, value):
+        """Check a decoded cursor value against the type of its sort key.
+
+        Raises:
+            ValueError: The value cannot be compared with the column.
+        """
+        if name == "release_date":
+            return date.fromisoformat(value)
+        # bool is an int, and json accepts NaN and Infinity.
+        if isinstance(value, bool):
+            raise ValueError(value)
+        if name == "id":
+            # content.id is an int4.
+            if not isinstance(value, int) or not -(2**31) <= value < 2**31:
+                raise ValueError(value)
+            return value
+        # vote_average and rank are floats.
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(value)
+        return float(value)
+
+    def after_cursor(self, sort_keys: List[tuple], cursor: str):
+        """Build the keyset condition selecting the rows after the cursor."""
+        values = decode_cursor(cursor, [self.sort_key_name(key) for key in sort_keys])
+        try:
+            values = [
+                self.cursor_value(name, value)
+                for (name, _, _), value in zip(sort_keys, values)
+            ]
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        columns = [column for _, column, _ in sort_keys]
+        directions = {direction for _, _, direction in sort_keys}
+        if len(directions) == 1:
+            # a row comparison can be answered by a single index range scan.
+            if directions.pop() == SortDirection.ASC:
+                return tuple_(*columns) > tuple_(*values)
+            return tuple_(*columns) < tuple_(*values)
+
+        # mixed directions, (k1 > v1) or (k1 = v1 and k2 < v2) or ...
+        conditions = []
+        for i, (_, column, direction) in enumerate(sort_keys):
+            if direction == SortDirection.ASC:
+                condition = column > values[i]
+            else:
+                condition = column < values[i]
+            equal = [columns[j] == values[j] for j in range(i)]
+            conditions.append(and_(*equal, condition))
+        return or_(*conditions)
 
-        return ContentListResponse(
-            data=items,
-            pagination=PaginationResponse(
-                current_page=pagination.page,
-                page_size=pagination.page_size,
-                total_items=total,
-                total_pages=pages,
-            ),
+    async def create_content(
+        self,
+        csv_path: str,
+        job: Optional["UploadJob"] = None,
+        chunk_bytes: int = settings.UPLOAD_CHUNK_BYTES,
+        parse_workers: int = settings.UPLOAD_PARSE_WORKERS,
+        csv_engine: str = settings.UPLOAD_CSV_ENGINE,
+    ) -> List[int]:
+        """Parse the csv file on the parse pool and write it to the database.
+
+        The file is split into row-aligned byte ranges of about chunk_bytes which
+        parse_workers processes parse, clean and transform in parallel, off the
+        event loop. Chunks are written in file order while the following ranges
+        are parsed, and at most two chunks per worker are held in memory.
+        csv_engine, "pandas" or "csv", parses the ranges, see parse_range.
+        Rows are upserted on their content_key, see BulkLoader. Progress is
+        recorded on the upload job, if one is given.
+
+        Returns:
+            list (int): Number of csv rows processed per chunk.
+        """
+        loop = asyncio.get_running_loop()
+        executor = get_executor(parse_workers)
+        header, ranges = await loop.run_in_executor(
+            executor, split_row_ranges, csv_path, chunk_bytes
         )
 
-    async def create_content(self, csv_buffer: StringIO):
-        df = pd.read_csv(csv_buffer)
-        df = self.clean_data(df)
-
-        await self.update_languages(df["languages"])
-        all_languages = await self.get_all_languages()
-        lang_map: dict[str, int] = {lang.name: lang.id for lang in all_languages}
-
-        records = df.to_dict(orient="records")
-        content_records = []
-        content_languages = []
-        for record in records:
-            content = Content(
-                budget=record["budget"],
-                revenue=record["revenue"],
-                runtime=record["runtime"],
-                status=record["status"],
-                homepage=record["homepage"],
-                original_language=record["original_language"],
-                original_title=record["original_title"],
-                title=record["title"],
-                overview=record["overview"],
-                release_date=parse_date(record["release_date"]),
-                vote_average=record["vote_average"],
-                vote_count=record["vote_count"],
-                production_company_id=record["production_company_id"],
-                genre_id=record["genre_id"],
-                languages=record["languages"],
-            )
-            content_records.append(content)
-
-        self.session.add_all(content_records)
-        await self.session.commit()
-        for content in content_records:
-            for lang in parse_languages(content.languages):
-                content_languages.append(
-                    ContentLanguage(content_id=content.id, language_id=lang_map[lang])
+        max_pending = max(parse_workers, 1) * 2
+        pending: deque[asyncio.Future] = deque()
+        rows_per_chunk: List[int] = []
+
+        async def write_next():
+            chunk: ParsedChunk = await pending.popleft()
+            metrics.observe_upload_stages(chunk.timings)
+            rows = len(chunk) + chunk.duplicates
+            if job:
+                job.record_parsed(rows)
+            result = await self.insert_chunk(chunk)
+            if job:
+                job.record_written(rows, result, chunk.duplicates)
+            rows_per_chunk.append(rows)
+
+        try:
+            for start, end in ranges:
+                pending.append(
+                    loop.run_in_executor(
+                        executor,
+                        parse_range,
+                        csv_path,
+                        header,
+                        start,
+                        end,
+                        csv_engine,
+                    )
                 )
-        self.session.add_all(content_languages)
-        await self.session.commit()
+                if len(pending) >= max_pending:
+                    await write_next()
+            while pending:
+                await write_next()
+        finally:
+            for future in pending:
+                future.cancel()
+        return rows_per_chunk
+
+    async def insert_chunk(self, chunk: ParsedChunk) -> UpsertResult:
+        """Upsert a chunk and its stats in one transaction.
+
+        New languages are created first, and committed on their own by the
+        language cache.
+        """
+        with tag_queries("insert"):
+            with metrics.upload_stage("language_sync"):
+                lang_map = await language_cache.get_or_create(
+                    self.session, chunk.language_names
+                )
+
+            with metrics.upload_stage("insert"):
+                # the stored rows the chunk matches leave their groups, and
+                # rejoin them with their new values once upserted.
+                stats = StatsService(self.session)
+                # concurrent uploads write their chunks one at a time from here.
+                await stats.lock()
+                keys = chunk.columns["content_key"]
+                replaced = await stats.add(keys, sign=-1)
+                loader = BulkLoader(self.session)
+                if self.loader == "copy":
+                    result = await loader.copy(chunk, lang_map)
+                else:
+                    result = await loader.insert(chunk, lang_map)
+                await stats.add(keys)
+                if replaced:
+                    await stats.remove_empty()
+                await self.session.commit()
+        if result.inserted or result.updated:
+            # also records the write, reads use the primary for the next while.
+            await dataset_version.bump()
+        return result
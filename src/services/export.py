@@ -0,0 +1,48 @@
+import csv
+import io
+from typing import AsyncIterator, List, Sequence
+
+import orjson
+
+from src.database import sessionmanager
+from src.schema.query_params import ContentFilterParams, ContentSortParams, ExportFormat
+from src.services.content_service import ContentService
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def encode_ndjson(fields: List[str], rows: Sequence[tuple]) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(fields, row))) + b"\n" for row in rows)
+
+
+def encode_csv(rows: Sequence[tuple]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_export(
+    filter_params: ContentFilterParams,
+    sort_params: List[ContentSortParams],
+    fields: List[str],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export, one chunk per batch of rows.
+
+    The request session is closed before a streaming body is sent, so the
+    export reads through its own session, held until the last row is sent.
+    """
+    async with sessionmanager.read_session() as session:
+        if export_format == ExportFormat.CSV:
+            yield encode_csv([fields])
+        batches = ContentService(session).export_content(
+            filter_params, sort_params, fields
+        )
+        async for rows in batches:
+            if export_format == ExportFormat.CSV:
+                yield encode_csv(rows)
+            else:
+                yield encode_ndjson(fields, rows)
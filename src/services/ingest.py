@@ -0,0 +1,179 @@
+"""CPU-bound stages of the csv upload: splitting, parsing, cleaning and transforming.
+
+The functions in this module run in worker processes, so they only take and
+return picklable values and never touch the database. Chunks are parsed by
+the UPLOAD_CSV_ENGINE module, imported on first use so that pandas is only
+loaded by processes that parse uploads with it.
+"""
+
+import mmap
+import os
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+CONTENT_FIELDS = [
+    "budget",
+    "revenue",
+    "runtime",
+    "status",
+    "homepage",
+    "original_language",
+    "original_title",
+    "title",
+    "languages",
+    "overview",
+    "release_date",
+    "vote_average",
+    "vote_count",
+    "production_company_id",
+    "genre_id",
+    "content_key",
+]
+FLOAT_FIELDS = ["budget", "revenue", "vote_average"]
+INT_FIELDS = ["runtime", "vote_count", "production_company_id", "genre_id"]
+# missing values are replaced with these, per column.
+FILL_VALUES = {
+    **dict.fromkeys(["budget", "revenue", "runtime", "vote_average", "vote_count"], 0),
+    **dict.fromkeys(
+        [
+            "status",
+            "homepage",
+            "original_language",
+            "original_title",
+            "title",
+            "overview",
+        ],
+        "NA",
+    ),
+    "release_date": "1900-01-01",
+    "languages": "[]",
+}
+# languages that are dropped by parse_languages.
+IGNORED_LANGUAGES = ["", "No Language"]
+# a quoted csv value, "" is an escaped quote, unterminated it runs to the end.
+QUOTED_VALUE = re.compile(rb'"[^"]*(?:""[^"]*)*(?:"|\Z)')
+# joins the identity fields hashed into content_key, chr(31) in the migration.
+KEY_SEPARATOR = "\x1f"
+
+_executor: Optional[Executor] = None
+
+
+@dataclass
+class ParsedChunk:
+    # column name -> values, for every name in CONTENT_FIELDS.
+    columns: Dict[str, list] = field(default_factory=dict)
+    # (row position, language name) pairs, one per language of a row.
+    language_rows: List[int] = field(default_factory=list)
+    language_values: List[str] = field(default_factory=list)
+    # rows dropped because a later row of the chunk has the same content_key.
+    duplicates: int = 0
+    # seconds spent in each parse stage, measured in the worker.
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.columns.get(CONTENT_FIELDS[0], []))
+
+    @property
+    def language_names(self) -> Set[str]:
+        return set(self.language_values)
+
+    def rows(self):
+        """Iterate over the chunk as tuples in CONTENT_FIELDS order."""
+        return zip(*(self.columns[name] for name in CONTENT_FIELDS))
+
+
+def get_executor(workers: int) -> Optional[Executor]:
+    """Return the shared parse process pool, or None to use the default thread pool."""
+    global _executor
+    if workers <= 0:
+        return None
+    if _executor is None:
+        # spawn, forking a process with a running event loop is not safe.
+        _executor = ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def quoted_values(data, start: int) -> Iterator[Tuple[int, int]]:
+    """Yield the (start, end) offsets of the quoted values in csv data.
+
+    As in csv.reader, only a quote that starts a field opens a value, a quote
+    inside an unquoted field is part of it.
+    """
+    position = start
+    while value := QUOTED_VALUE.search(data, position):
+        if data[value.start() - 1] in b",\n":
+            yield value.span()
+            position = value.end()
+        else:
+            position = value.start() + 1
+
+
+def row_ranges(data, start: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split csv data from start, the beginning of a row, into row ranges."""
+    ranges = []
+    values = quoted_values(data, start)
+    value = next(values, None)
+    range_start = start
+    target = range_start + chunk_bytes
+    while (newline := data.find(b"\n", target)) != -1:
+        while value is not None and value[1] <= newline:
+            value = next(values, None)
+        if value is not None and value[0] < newline:
+            # inside a quoted value, the row ends after it.
+            target = value[1]
+            continue
+        ranges.append((range_start, newline + 1))
+        range_start = newline + 1
+        target = range_start + chunk_bytes
+    if len(data) > range_start:
+        ranges.append((range_start, len(data)))
+    return ranges
+
+
+def split_row_ranges(
+    path: str, chunk_bytes: int
+) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """Split a csv file into byte ranges of about chunk_bytes, aligned on rows.
+
+    The file is memory mapped and its quoted values are found the way the
+    parsers read them, so newlines inside quoted values never end a range,
+    even after a stray quote in an unquoted field.
+
+    Returns:
+        tuple: The header line and a list of (start, end) byte offsets.
+    """
+    with open(path, "rb") as csv_file:
+        header = csv_file.readline()
+        if os.fstat(csv_file.fileno()).st_size <= len(header):
+            return header, []
+        with mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return header, row_ranges(data, len(header), chunk_bytes)
+
+
+def parse_range(
+    path: str, header: bytes, start: int, end: int, engine: str = "pandas"
+) -> ParsedChunk:
+    """Parse, clean and transform the rows between two byte offsets of the file."""
+    started = time.perf_counter()
+    with open(path, "rb") as csv_file:
+        csv_file.seek(start)
+        data = csv_file.read(end - start)
+    read = time.perf_counter()
+    if engine == "csv":
+        from src.services.ingest_csv import parse_chunk
+    else:
+        from src.services.ingest_pandas import parse_chunk
+    chunk = parse_chunk(header + data)
+    chunk.timings = {"read": read - started, **chunk.timings}
+    return chunk
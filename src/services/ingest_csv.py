@@ -0,0 +1,152 @@
+"""Stdlib csv engine of the upload parse, UPLOAD_CSV_ENGINE=csv.
+
+Builds the same chunks as the pandas engine without importing pandas and
+numpy, tests/test_ingest_engines.py compares the two.
+"""
+
+import csv
+import hashlib
+import io
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, List
+
+from src.services.ingest import (
+    CONTENT_FIELDS,
+    FILL_VALUES,
+    FLOAT_FIELDS,
+    IGNORED_LANGUAGES,
+    INT_FIELDS,
+    KEY_SEPARATOR,
+    ParsedChunk,
+)
+
+# strings pandas.read_csv reads as missing values by default.
+NA_VALUES = frozenset(
+    [
+        "",
+        "#N/A",
+        "#N/A N/A",
+        "#NA",
+        "-1.#IND",
+        "-1.#QNAN",
+        "-NaN",
+        "-nan",
+        "1.#IND",
+        "1.#QNAN",
+        "<NA>",
+        "N/A",
+        "NA",
+        "NULL",
+        "NaN",
+        "None",
+        "n/a",
+        "nan",
+        "null",
+    ]
+)
+
+
+def to_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        # "120.0", pandas reads the column as floats and truncates them.
+        return int(float(value))
+
+
+@lru_cache(maxsize=65536)
+def to_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def read_columns(data: bytes) -> Dict[str, list]:
+    """Column name -> values of csv data, header row included."""
+    reader = csv.reader(io.StringIO(data.decode("utf-8-sig"), newline=""))
+    header = next(reader)
+    rows = [row for row in reader if row]
+    width = len(header)
+    for number, row in enumerate(rows):
+        if len(row) > width:
+            raise ValueError(
+                f"Expected {width} fields in row {number + 1}, saw {len(row)}"
+            )
+        if len(row) < width:
+            # missing trailing fields are missing values.
+            rows[number] = row + [""] * (width - len(row))
+    columns = zip(*rows) if rows else [()] * width
+    return {name: list(values) for name, values in zip(header, columns)}
+
+
+def clean_data(columns: Dict[str, list]) -> Dict[str, list]:
+    for name, fill in FILL_VALUES.items():
+        fill = str(fill)
+        columns[name] = [
+            fill if value in NA_VALUES else value for value in columns[name]
+        ]
+    return columns
+
+
+def transform(columns: Dict[str, list]) -> ParsedChunk:
+    """Convert cleaned columns into a chunk, with the rules of the pandas engine."""
+    columns = {name: columns[name] for name in CONTENT_FIELDS if name != "content_key"}
+    for name in FLOAT_FIELDS:
+        columns[name] = [float(value) for value in columns[name]]
+    for name in INT_FIELDS:
+        columns[name] = [to_int(value) for value in columns[name]]
+    columns["release_date"] = [to_date(value) for value in columns["release_date"]]
+    columns["content_key"] = [
+        hashlib.md5(
+            KEY_SEPARATOR.join(
+                [title, original_title, release_date.isoformat(), str(company_id)]
+            ).encode("utf-8")
+        ).hexdigest()
+        for title, original_title, release_date, company_id in zip(
+            columns["title"],
+            columns["original_title"],
+            columns["release_date"],
+            columns["production_company_id"],
+        )
+    ]
+
+    # only the last row of a content_key is kept.
+    last_rows = {key: row for row, key in enumerate(columns["content_key"])}
+    duplicates = len(columns["content_key"]) - len(last_rows)
+    if duplicates:
+        kept = sorted(last_rows.values())
+        columns = {
+            name: [values[row] for row in kept] for name, values in columns.items()
+        }
+
+    language_rows: List[int] = []
+    language_values: List[str] = []
+    for row, languages in enumerate(columns["languages"]):
+        names = languages.strip("[]").replace("'", "").split(", ")
+        # a language listed twice for the same row is stored once.
+        for name in dict.fromkeys(names):
+            if name not in IGNORED_LANGUAGES and "?" not in name:
+                language_rows.append(row)
+                language_values.append(name)
+    return ParsedChunk(
+        columns={name: columns[name] for name in CONTENT_FIELDS},
+        language_rows=language_rows,
+        language_values=language_values,
+        duplicates=duplicates,
+    )
+
+
+def parse_chunk(data: bytes) -> ParsedChunk:
+    """Parse csv data, header row included, into a chunk."""
+    started = time.perf_counter()
+    columns = read_columns(data)
+    parsed = time.perf_counter()
+    columns = clean_data(columns)
+    cleaned = time.perf_counter()
+    chunk = transform(columns)
+    chunk.timings = {
+        "parse": parsed - started,
+        "clean": cleaned - parsed,
+        "transform": time.perf_counter() - cleaned,
+    }
+    return chunk
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from src.models.content import Language
+
+
+class LanguageCache:
+    """Process-wide map of language names, and their lowercase form, to ids.
+
+    The language table only grows, so entries never go stale. Names that are not
+    cached are looked up (and inserted, for uploads) in the database and added
+    to the cache, which also picks up languages inserted by other processes.
+    """
+
+    def __init__(self) -> None:
+        self._ids_by_name: Dict[str, int] = {}
+        self._ids_by_lower_name: Dict[str, Set[int]] = {}
+        # serializes inserts so concurrent uploads do not race on new languages.
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._ids_by_name)
+
+    def add(self, name: str, language_id: int):
+        self._ids_by_name[name] = language_id
+        self._ids_by_lower_name.setdefault(name.lower(), set()).add(language_id)
+
+    def clear(self):
+        """Forget every language, for when the language table is truncated."""
+        self._ids_by_name.clear()
+        self._ids_by_lower_name.clear()
+
+    def count(self, requested: int, missing: int):
+        self.hits += requested - missing
+        self.misses += missing
+
+    async def warm(self, session: AsyncSession):
+        result = await session.execute(select(Language.id, Language.name))
+        for language_id, name in result.all():
+            self.add(name, language_id)
+
+    async def get_or_create(
+        self, session: AsyncSession, names: Set[str]
+    ) -> Dict[str, int]:
+        """Return the id of every name, inserting the languages that do not exist.
+
+        New languages are committed before they are cached, so the cache never
+        holds ids of rows that were rolled back.
+        """
+        missing = names - self._ids_by_name.keys()
+        self.count(len(names), len(missing))
+        if missing:
+            async with self._lock:
+                missing = names - self._ids_by_name.keys()
+                if missing:
+                    await session.execute(
+                        insert(Language)
+                        .values([{"name": name} for name in missing])
+                        .on_conflict_do_nothing(index_elements=["name"])
+                    )
+                    result = await session.execute(
+                        select(Language.id, Language.name).where(
+                            Language.name.in_(list(missing))
+                        )
+                    )
+                    rows = result.all()
+                    await session.commit()
+                    for language_id, name in rows:
+                        self.add(name, language_id)
+        return {name: self._ids_by_name[name] for name in names}
+
+    async def resolve(self, session: AsyncSession, names: Iterable[str]) -> List[int]:
+        """Return the ids of the languages matching names, ignoring case.
+
+        Unknown names are skipped.
+        """
+        lower_names = {name.strip().lower() for name in names}
+        missing = lower_names - self._ids_by_lower_name.keys()
+        self.count(len(lower_names), len(missing))
+        if missing:
+            result = await session.execute(
+                select(Language.id, Language.name).where(
+                    func.lower(Language.name).in_(list(missing))
+                )
+            )
+            for language_id, name in result.all():
+                self.add(name, language_id)
+
+        language_ids = set()
+        for name in lower_names:
+            language_ids.update(self._ids_by_lower_name.get(name, ()))
+        return sorted(language_ids)
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+        }
+
+
+language_cache = LanguageCache()
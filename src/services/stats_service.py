@@ -0,0 +1,162 @@
+"""Summary table behind GET /content/stats, maintained incrementally by uploads.
+
+Rebuild it from content, e.g. after changing rows outside of uploads:
+
+    $ python -m src.services.stats_service
+"""
+
+import asyncio
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlmodel import delete, text
+
+from src.database import sessionmanager
+from src.models.content import ALL_LANGUAGES, ContentStats, Language
+from src.schema.query_params import StatsGroup
+
+# adds sign times the aggregates of the active rows with the given keys.
+ADD_STATS = (
+    "WITH chunk AS (SELECT language_ids, extract(year FROM release_date)::int AS year, "
+    "genre_id, vote_average, revenue FROM content "
+    "WHERE is_deleted = false AND content_key = ANY(:keys)) "
+    "INSERT INTO contentstats "
+    "(language_id, year, genre_id, content_count, vote_average_sum, revenue_sum) "
+    "SELECT language_id, year, genre_id, "
+    ":sign * count(*), :sign * sum(vote_average), :sign * sum(revenue) FROM ("
+    f"SELECT {ALL_LANGUAGES} AS language_id, * FROM chunk UNION ALL "
+    "SELECT language_id, chunk.* FROM chunk, unnest(chunk.language_ids) AS language_id"
+    ") AS rows "
+    # in key order, so concurrent uploads lock the rows in the same order.
+    "GROUP BY 1, 2, 3 ORDER BY 1, 2, 3 "
+    "ON CONFLICT (language_id, year, genre_id) DO UPDATE SET "
+    "content_count = contentstats.content_count + excluded.content_count, "
+    "vote_average_sum = contentstats.vote_average_sum + excluded.vote_average_sum, "
+    "revenue_sum = contentstats.revenue_sum + excluded.revenue_sum"
+)
+# the same aggregates the uploads maintain, computed from scratch.
+REBUILD_STATEMENTS = [
+    "TRUNCATE contentstats",
+    "INSERT INTO contentstats "
+    "(language_id, year, genre_id, content_count, vote_average_sum, revenue_sum) "
+    f"SELECT {ALL_LANGUAGES}, extract(year FROM release_date)::int, genre_id, "
+    "count(*), sum(vote_average), sum(revenue) "
+    "FROM content WHERE is_deleted = false GROUP BY 2, 3",
+    "INSERT INTO contentstats "
+    "(language_id, year, genre_id, content_count, vote_average_sum, revenue_sum) "
+    "SELECT language_id, extract(year FROM release_date)::int, genre_id, "
+    "count(*), sum(vote_average), sum(revenue) "
+    "FROM content, unnest(language_ids) AS language_id "
+    "WHERE is_deleted = false GROUP BY 1, 2, 3",
+]
+
+
+def stats_row(groups: dict, count: Optional[int], vote_sum, revenue_sum) -> dict:
+    """Shape an aggregate as a ContentStatsRow."""
+    count = count or 0
+    return {
+        **groups,
+        "count": count,
+        "average_rating": round(vote_sum / count, 2) if count else None,
+        "total_revenue": round(revenue_sum or 0.0, 2),
+    }
+
+
+class StatsService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def lock(self):
+        """Hold the summary until the transaction ends, for one upload at a time.
+
+        Under read committed, the subtract pass of an upload would miss a row
+        another upload commits meanwhile, and then add it a second time once
+        its own upsert matches that row. Reads are not blocked.
+        """
+        await self.session.execute(
+            text("LOCK TABLE contentstats IN SHARE ROW EXCLUSIVE MODE")
+        )
+
+    async def add(self, keys: List[str], sign: int = 1) -> int:
+        """Add the active rows with these content keys to their groups.
+
+        sign -1 subtracts them instead.
+
+        Returns:
+            int: The number of groups changed.
+        """
+        if not keys:
+            return 0
+        result = await self.session.execute(
+            text(ADD_STATS), {"keys": keys, "sign": sign}
+        )
+        return result.rowcount
+
+    async def remove_empty(self):
+        await self.session.execute(
+            delete(ContentStats).where(ContentStats.content_count <= 0)
+        )
+
+    async def rebuild(self):
+        """Recompute every row from content, in one transaction."""
+        for statement in REBUILD_STATEMENTS:
+            await self.session.execute(text(statement))
+        await self.session.commit()
+
+    async def summary(
+        self,
+        year: Optional[Tuple[int, int]],
+        language_ids: Optional[List[int]],
+        group_by: List[StatsGroup],
+    ) -> List[dict]:
+        """Aggregate the summary rows, filtered by year range and languages.
+
+        Exact when at most one language is filtered on or languages are grouped.
+        """
+        columns = {
+            StatsGroup.YEAR: ContentStats.year,
+            StatsGroup.LANGUAGE: Language.name.label("language"),
+            StatsGroup.GENRE: ContentStats.genre_id,
+        }
+        group_columns = [columns[group] for group in group_by]
+        query = select(
+            *group_columns,
+            func.sum(ContentStats.content_count),
+            func.sum(ContentStats.vote_average_sum),
+            func.sum(ContentStats.revenue_sum),
+        ).select_from(ContentStats)
+
+        if StatsGroup.LANGUAGE in group_by:
+            # there is no language ALL_LANGUAGES, the join leaves it out.
+            query = query.join(Language, Language.id == ContentStats.language_id)
+        if language_ids is not None:
+            query = query.where(ContentStats.language_id.in_(language_ids))
+        elif StatsGroup.LANGUAGE not in group_by:
+            query = query.where(ContentStats.language_id == ALL_LANGUAGES)
+        if year:
+            query = query.where(ContentStats.year.between(*year))
+        if group_columns:
+            query = (
+                query.group_by(*group_columns)
+                .having(func.sum(ContentStats.content_count) > 0)
+                .order_by(*group_columns)
+            )
+
+        names = [column.key for column in group_columns]
+        result = await self.session.execute(query)
+        return [
+            stats_row(dict(zip(names, row[: len(names)])), *row[len(names) :])
+            for row in result.all()
+        ]
+
+
+async def main():
+    async with sessionmanager.session() as session:
+        await StatsService(session).rebuild()
+    await sessionmanager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import UploadFile
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
+
+from src.config import settings
+from src.database import sessionmanager
+from src.models.upload import Upload
+from src.schema.upload_response import UploadJobResponse, UploadJobStatus
+from src.services.bulk_loader import UpsertResult
+from src.services.content_service import ContentService
+
+SPOOL_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadJob:
+    """Progress of a single csv upload processed in the background."""
+
+    def __init__(self, filename: str, path: str, checksum: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.path = path
+        self.checksum = checksum
+        self.status = UploadJobStatus.QUEUED
+        # set when the same file was ingested before, and nothing was written.
+        self.skipped = False
+        self.rows_parsed = 0
+        self.rows_inserted = 0
+        self.rows_updated = 0
+        self.rows_unchanged = 0
+        self.rows_duplicate = 0
+        self.rows_per_chunk: list[int] = []
+        self.errors: list[str] = []
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def start(self):
+        self.status = UploadJobStatus.RUNNING
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.monotonic()
+
+    def finish(self, error: Optional[str] = None):
+        if error:
+            self.errors.append(error)
+        self.status = UploadJobStatus.FAILED if error else UploadJobStatus.COMPLETED
+        self.finished_at = datetime.now(timezone.utc)
+        self._finished = time.monotonic()
+
+    def record_parsed(self, rows: int):
+        self.rows_parsed += rows
+
+    def record_written(self, rows: int, result: UpsertResult, duplicates: int):
+        self.rows_inserted += result.inserted
+        self.rows_updated += result.updated
+        self.rows_unchanged += result.unchanged
+        self.rows_duplicate += duplicates
+        self.rows_per_chunk.append(rows)
+
+    def record_skipped(self, previous: Upload):
+        self.skipped = True
+        self.rows_parsed = self.rows_unchanged = previous.rows
+
+    @property
+    def done(self) -> bool:
+        return self.status in (UploadJobStatus.COMPLETED, UploadJobStatus.FAILED)
+
+    @property
+    def rows_per_second(self) -> float:
+        if self._started is None:
+            return 0.0
+        elapsed = (self._finished or time.monotonic()) - self._started
+        return round(self.rows_parsed / elapsed, 2) if elapsed > 0 else 0.0
+
+    def to_response(self) -> UploadJobResponse:
+        return UploadJobResponse(
+            job_id=self.id,
+            filename=self.filename,
+            status=self.status,
+            completed=self.done,
+            checksum=self.checksum,
+            skipped=self.skipped,
+            rows_parsed=self.rows_parsed,
+            rows_inserted=self.rows_inserted,
+            rows_updated=self.rows_updated,
+            rows_unchanged=self.rows_unchanged,
+            rows_duplicate=self.rows_duplicate,
+            rows_per_chunk=self.rows_per_chunk,
+            rows_per_second=self.rows_per_second,
+            errors=self.errors,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+        )
+
+
+class UploadJobManager:
+    """Spool uploads to disk and ingest them on background tasks.
+
+    At most max_concurrent_jobs uploads are ingested at the same time, the rest
+    wait in the queue. Finished jobs are kept for status queries until there
+    are more than history_size of them. A file whose sha256 matches an earlier
+    successful upload is not ingested again.
+    """
+
+    def __init__(self, max_concurrent_jobs: int, spool_dir: str, history_size: int):
+        self.spool_dir = spool_dir
+        self.history_size = history_size
+        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        self._jobs: OrderedDict[str, UploadJob] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def get(self, job_id: str) -> Optional[UploadJob]:
+        return self._jobs.get(job_id)
+
+    async def submit(self, csv_file: UploadFile) -> UploadJob:
+        path, checksum = await run_in_threadpool(self.spool, csv_file)
+        job = UploadJob(csv_file.filename, path, checksum)
+        self._jobs[job.id] = job
+        self.prune()
+
+        task = asyncio.create_task(self.run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def spool(self, csv_file: UploadFile) -> tuple[str, str]:
+        """Copy the upload to the spool dir, returning its path and sha256."""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        checksum = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(
+            dir=self.spool_dir, prefix="upload_", suffix=".csv", delete=False
+        ) as spool_file:
+            csv_file.file.seek(0)
+            while block := csv_file.file.read(SPOOL_BLOCK_SIZE):
+                checksum.update(block)
+                spool_file.write(block)
+        return spool_file.name, checksum.hexdigest()
+
+    async def run(self, job: UploadJob):
+        try:
+            async with self._semaphore:
+                job.start()
+                async with sessionmanager.session() as session:
+                    previous = await session.scalar(
+                        select(Upload).where(Upload.checksum == job.checksum)
+                    )
+                    if previous:
+                        job.record_skipped(previous)
+                    else:
+                        await ContentService(session).create_content(job.path, job=job)
+                        await self.record_upload(session, job)
+            job.finish()
+        except asyncio.CancelledError:
+            job.finish("Upload was cancelled")
+            raise
+        except Exception as exc:
+            job.finish(f"{type(exc).__name__}: {exc}")
+        finally:
+            os.remove(job.path)
+
+    async def record_upload(self, session: AsyncSession, job: UploadJob):
+        # a concurrent upload of the same file may have recorded it first.
+        await session.execute(
+            insert(Upload)
+            .values(
+                checksum=job.checksum,
+                filename=job.filename,
+                rows=job.rows_parsed,
+                rows_inserted=job.rows_inserted,
+                rows_updated=job.rows_updated,
+                rows_unchanged=job.rows_unchanged,
+            )
+            .on_conflict_do_nothing(index_elements=[Upload.checksum])
+        )
+        await session.commit()
+
+    def prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(len(self._jobs) - self.history_size, 0)]:
+            del self._jobs[job_id]
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+upload_jobs = UploadJobManager(
+    settings.UPLOAD_MAX_CONCURRENT_JOBS,
+    settings.UPLOAD_SPOOL_DIR,
+    settings.UPLOAD_JOB_HISTORY_SIZE,
+)
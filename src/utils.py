@@ -1,3 +1,5 @@
+import base64
+import json
 from datetime import date, datetime
 from fastapi import UploadFile, HTTPException
 
@@ -39,3 +41,31 @@ def validate_csv_file(file: UploadFile) -> bool:
             },
         )
     return True
+
+
+def encode_cursor(sort_keys: list[str], values: list) -> str:
+    """Encode the sort keys and values of the last row of a page as an opaque cursor.
+
+    Args:
+        sort_keys (list): Sort keys of the query. Example: ["rating:desc", "id:desc"]
+        values (list): Values of the sort keys in the last row of the page.
+    """
+    payload = json.dumps({"k": sort_keys, "v": values}, default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort_keys: list[str]) -> list:
+    """Decode a cursor and return its values, the cursor must match the sort keys."""
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        cursor_keys, values = payload["k"], payload["v"]
+        if not isinstance(values, list):
+            raise TypeError(values)
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_keys != sort_keys or len(values) != len(sort_keys):
+        raise HTTPException(
+            status_code=400, detail="Cursor does not match the sort order"
+        )
+    return values
@@ -0,0 +1,25 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+# without the lifespan, requests rejected before a session is opened need no
+# database.
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/content", "/content/export"])
+@pytest.mark.parametrize(
+    "sort", ["foo", "foo:asc", "rating:up", "release_date:desc,title"]
+)
+def test_invalid_sort_is_a_400(path, sort):
+    response = client.get(path, params={"sort": sort})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid sort")
+
+
+def test_more_than_two_sort_fields_is_a_400():
+    response = client.get(
+        "/content", params={"sort": "rating,release_date,rating:desc"}
+    )
+    assert response.status_code == 400
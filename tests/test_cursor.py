@@ -0,0 +1,66 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from src.schema.query_params import ContentSortParams
+from src.services.content_service import ContentService
+from src.utils import decode_cursor, encode_cursor
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode()
+
+
+def after_cursor(cursor: str, sort: list[ContentSortParams] = []):
+    service = ContentService(session=None)
+    return service.after_cursor(service.get_sort_keys(sort), cursor)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["rating:desc", "id:desc"], [7.5, 42])
+    assert decode_cursor(cursor, ["rating:desc", "id:desc"]) == [7.5, 42]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        raw_cursor([]),
+        raw_cursor({"k": ["id:asc"]}),
+        raw_cursor({"k": ["id:asc"], "v": 5}),
+        raw_cursor({"k": ["id:asc"], "v": None}),
+        raw_cursor({"k": ["id:asc"], "v": "5"}),
+        raw_cursor({"k": ["id:asc"], "v": {"0": 5}}),
+        raw_cursor({"k": ["id:asc"], "v": ["5"]}),
+        raw_cursor({"k": ["id:asc"], "v": [True]}),
+        raw_cursor({"k": ["id:asc"], "v": [2**31]}),
+        raw_cursor({"k": ["id:asc"], "v": [None]}),
+        raw_cursor({"k": ["id:asc"], "v": [1, 2]}),
+        raw_cursor({"k": ["id:desc"], "v": [1]}),
+    ],
+)
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        after_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "values",
+    [["2020-13-01", 1], [[2020], 1], [None, 1], ["2020-01-01", 1.5]],
+)
+def test_malformed_release_date_cursor_is_a_400(values):
+    sort = [ContentSortParams(field="release_date", direction="asc")]
+    cursor = raw_cursor({"k": ["release_date:asc", "id:asc"], "v": values})
+    with pytest.raises(HTTPException) as raised:
+        after_cursor(cursor, sort)
+    assert raised.value.status_code == 400
+
+
+def test_valid_cursor_builds_a_condition():
+    sort = [ContentSortParams(field="rating", direction="desc")]
+    cursor = encode_cursor(["vote_average:desc", "id:desc"], [7.5, 42])
+    assert after_cursor(cursor, sort) is not None
@@ -0,0 +1,182 @@
+"""Check with EXPLAIN that the GET /content query shapes are answered by index scans.
+
+Runs against the database in DATABASE_URL, migrated to head, and is skipped
+when it is not set. Its content tables are truncated and loaded with a
+synthetic catalog, so point it at a scratch database. A few marker rows
+released in a year and spoken in a language the catalog has none of make the
+selective filters, which only an index scan answers well.
+
+    $ DATABASE_URL=postgresql+asyncpg://... pytest tests/test_explain_indexes.py
+"""
+
+import asyncio
+import csv
+import os
+
+import pytest
+
+if not os.environ.get("DATABASE_URL"):
+    pytest.skip("DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy.future import select
+from sqlmodel import func, text
+
+from benchmarks.bulk_load import reset_tables
+from benchmarks.datagen import CSV_COLUMNS, cached_csv, generate_rows
+from src.database import sessionmanager
+from src.models.content import Content
+from src.schema.query_params import ContentFilterParams, ContentSortParams
+from src.services.content_service import ContentService
+
+CATALOG_ROWS = 20_000
+MARKER_ROWS = 5
+# the catalog starts in 1916, missing release dates are read as 1900.
+MARKER_YEAR = "1905"
+MARKER_LANGUAGE = "Esperanto"
+PAGE_SIZE = 20
+
+# (filters, sort, expected index prefixes of the page query)
+PAGE_QUERIES = [
+    ({}, "release_date:asc", ["ix_content_release_date_id_active"]),
+    ({}, "release_date:desc", ["ix_content_release_date_id_active"]),
+    ({}, "rating:asc", ["ix_content_vote_average_id_active"]),
+    ({}, "rating:desc", ["ix_content_vote_average_id_active"]),
+    (
+        {},
+        "release_date:desc,rating:desc",
+        ["ix_content_release_date_vote_average_id_active"],
+    ),
+    (
+        {},
+        "rating:asc,release_date:asc",
+        ["ix_content_vote_average_release_date_id_active"],
+    ),
+    ({"year": MARKER_YEAR}, None, ["ix_content_release_date"]),
+    ({"year": "2001"}, "release_date:desc", ["ix_content_release_date_id_active"]),
+    ({"year": "1990-1995"}, "release_date:asc", ["ix_content_release_date_id_active"]),
+    ({"language": MARKER_LANGUAGE}, None, ["ix_content_language_ids_active"]),
+    (
+        {"language": MARKER_LANGUAGE},
+        "release_date:desc",
+        ["ix_content_language_ids_active"],
+    ),
+    # ranked search, titles with a "(row number)" suffix are the selective terms.
+    ({"q": "war 45"}, None, ["ix_content_search_vector_active"]),
+    (
+        {"q": "war 45", "year": "1990-2010"},
+        None,
+        ["ix_content_search_vector_active", "ix_content_release_date"],
+    ),
+]
+# (filters, expected index prefixes of the count query)
+COUNT_QUERIES = [
+    ({"year": "2001"}, ["ix_content_release_date"]),
+    ({"year": "1990-1995"}, ["ix_content_release_date"]),
+    ({"language": "हिन्दी"}, ["ix_content_language_ids_active"]),
+    ({"language": MARKER_LANGUAGE}, ["ix_content_language_ids_active"]),
+    ({"q": "war 45"}, ["ix_content_search_vector_active"]),
+]
+
+
+def parse_sort(sort: str | None) -> list[ContentSortParams]:
+    sort_params = []
+    for sort_by in sort.split(",") if sort else []:
+        field, direction = sort_by.split(":")
+        sort_params.append(ContentSortParams(field=field, direction=direction))
+    return sort_params
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def write_markers(path: str) -> str:
+    release_date = CSV_COLUMNS.index("release_date")
+    languages = CSV_COLUMNS.index("languages")
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(CSV_COLUMNS)
+        for day, row in enumerate(generate_rows(MARKER_ROWS, seed=1900), start=1):
+            row[release_date] = f"{MARKER_YEAR}-01-{day:02d}"
+            row[languages] = repr([MARKER_LANGUAGE])
+            writer.writerow(row)
+    return path
+
+
+async def explain(session, query) -> list[dict]:
+    # sent to the driver as is, text() would read ":word" as a parameter.
+    connection = await session.connection()
+    sql = query.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+    return list(plan_nodes(result.scalar()[0]["Plan"]))
+
+
+async def explain_all(markers_path: str) -> dict[str, list[dict]]:
+    plans = {}
+    async with sessionmanager.session() as session:
+        service = ContentService(session)
+        # plans depend on the table statistics, the catalog is always the same.
+        await reset_tables()
+        await service.create_content(cached_csv(CATALOG_ROWS), parse_workers=0)
+        await service.create_content(markers_path, parse_workers=0)
+        await session.execute(text("ANALYZE"))
+        await session.commit()
+
+        for filters, sort, _ in PAGE_QUERIES:
+            query = await service.filter_query(
+                select(Content), ContentFilterParams(**filters)
+            )
+            sort_keys = service.get_sort_keys(parse_sort(sort), filters.get("q"))
+            query = service.order_query(query, sort_keys)
+            plans[f"page {filters} {sort}"] = await explain(
+                session, query.limit(PAGE_SIZE)
+            )
+        for filters, _ in COUNT_QUERIES:
+            query = await service.filter_query(
+                select(func.count()).select_from(Content),
+                ContentFilterParams(**filters),
+            )
+            plans[f"count {filters}"] = await explain(session, query)
+    # the engine is bound to this event loop.
+    for engine in sessionmanager.engines().values():
+        await engine.dispose()
+    return plans
+
+
+@pytest.fixture(scope="module")
+def plans(tmp_path_factory) -> dict[str, list[dict]]:
+    markers_path = write_markers(str(tmp_path_factory.mktemp("explain") / "m.csv"))
+    return asyncio.run(explain_all(markers_path))
+
+
+def indexes(nodes: list[dict]) -> set[str]:
+    return {node["Index Name"] for node in nodes if "Index Name" in node}
+
+
+def seq_scans(nodes: list[dict]) -> set[str]:
+    return {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"}
+
+
+@pytest.mark.parametrize("filters, sort, expected_indexes", PAGE_QUERIES)
+def test_page_query_uses_its_index(plans, filters, sort, expected_indexes):
+    nodes = plans[f"page {filters} {sort}"]
+    used = indexes(nodes)
+    assert any(
+        index.startswith(expected) for index in used for expected in expected_indexes
+    ), used
+    assert "content_pkey" not in used
+    assert "content" not in seq_scans(nodes)
+
+
+# counting a large share of the table may be cheaper with a hash join, so
+# scans of the other tables are allowed.
+@pytest.mark.parametrize("filters, expected_indexes", COUNT_QUERIES)
+def test_count_query_uses_its_index(plans, filters, expected_indexes):
+    used = indexes(plans[f"count {filters}"])
+    assert any(
+        index.startswith(expected) for index in used for expected in expected_indexes
+    ), used
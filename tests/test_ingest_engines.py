@@ -0,0 +1,57 @@
+import pytest
+
+from src.services import ingest_csv, ingest_pandas
+
+HEADER = (
+    "budget,revenue,runtime,status,homepage,original_language,original_title,"
+    "title,overview,release_date,vote_average,vote_count,production_company_id,"
+    "genre_id,languages\n"
+)
+EDGE_CASES = (
+    # BOM before the header, missing and NA values.
+    "﻿"
+    + HEADER
+    + ",,,,,en,Orig 0,Title 0,,,,,1,2,\n"
+    + "NA,N/A,120.0,None,null,en,NA,nan,#N/A,2001-02-03,NaN,4,3,4,\"['English']\"\n"
+    # quoted newlines and quotes.
+    + '5,6,7,Released,h,en,Orig 1,"Title, 1","multi\nline ""quoted""",'
+    "2001-2-3,7.25,10,3,4,\"['English', 'English', '??', 'Deutsch', '']\"\n"
+    # duplicate keys, the last row wins.
+    + "5,6,7,Released,h,en,Orig 2,Title 2,first,2001-02-03,1,1,3,4,[]\n"
+    + "\n"
+    + "1e3,2.5,8,Rumored,h,fr,Orig 2,Title 2,last,2001-02-03,2,2,3,4,"
+    "\"['No Language']\"\n"
+    # a short row, the missing fields are missing values.
+    + "7,8,9,Released,h,fr,Ürig,Ünïcödé,short,1999-12-31,1,4,5,6\n"
+)
+# a chunk whose titles all look like numbers.
+NUMERIC_TITLES = (
+    HEADER
+    + "1,2,3,Released,h,en,007,007,o,2000-01-01,1,1,1,1,[]\n"
+    + "1,2,3,Released,h,en,1.50,1e3,o,2000-01-01,1,1,1,1,[]\n"
+)
+
+
+@pytest.mark.parametrize(
+    "data", [EDGE_CASES, NUMERIC_TITLES], ids=["edge_cases", "numeric_titles"]
+)
+def test_engines_parse_the_same_chunk(data):
+    data = data.encode("utf-8")
+    expected = ingest_pandas.parse_chunk(data)
+    chunk = ingest_csv.parse_chunk(data)
+
+    assert chunk.columns == expected.columns
+    for name, values in expected.columns.items():
+        assert [type(value) for value in chunk.columns[name]] == [
+            type(value) for value in values
+        ], name
+    assert chunk.language_rows == expected.language_rows
+    assert chunk.language_values == expected.language_values
+    assert chunk.duplicates == expected.duplicates
+
+
+def test_numeric_titles_are_kept_as_strings():
+    chunk = ingest_pandas.parse_chunk(NUMERIC_TITLES.encode("utf-8"))
+
+    assert chunk.columns["title"] == ["007", "1e3"]
+    assert chunk.columns["original_title"] == ["007", "1.50"]
@@ -0,0 +1,58 @@
+import asyncio
+
+from src.cache import DatasetVersion, MemoryCacheBackend
+from src.database import DatabaseSessionManager
+
+PRIMARY_URL = "postgresql+asyncpg://postgres:@localhost/primary"
+REPLICA_URL = "postgresql+asyncpg://postgres:@localhost/replica"
+
+
+def worker(version: DatasetVersion, **kwargs) -> DatabaseSessionManager:
+    # engines only connect on first use, none is needed here.
+    return DatabaseSessionManager(
+        PRIMARY_URL, read_host=REPLICA_URL, last_write=version.last_write, **kwargs
+    )
+
+
+def test_recent_write_of_another_worker_reads_the_primary():
+    async def run():
+        version = DatasetVersion(MemoryCacheBackend(10, 60))
+        uploader = worker(version, read_your_writes_seconds=60)
+        reader = worker(version, read_your_writes_seconds=60)
+        assert await reader.use_replica()
+        # the upload ran on the other worker, only the backend is shared.
+        await version.bump()
+        assert not await reader.use_replica()
+        assert not await uploader.use_replica()
+
+    asyncio.run(run())
+
+
+def test_write_older_than_the_window_reads_the_replica():
+    async def run():
+        version = DatasetVersion(MemoryCacheBackend(10, 60))
+        await version.bump()
+        reader = worker(version, read_your_writes_seconds=0.01)
+        await asyncio.sleep(0.02)
+        assert await reader.use_replica()
+
+    asyncio.run(run())
+
+
+def test_no_replica_reads_the_primary():
+    async def run():
+        version = DatasetVersion(MemoryCacheBackend(10, 60))
+        manager = DatabaseSessionManager(PRIMARY_URL, last_write=version.last_write)
+        assert not await manager.use_replica()
+
+    asyncio.run(run())
+
+
+def test_replica_reads_are_only_fresh_with_a_window():
+    version = DatasetVersion(MemoryCacheBackend(10, 60))
+    for window, fresh in [(0, False), (5, True)]:
+        manager = worker(version, read_your_writes_seconds=window)
+        replica = manager._read_sessionmaker()
+        replica.info["replica"] = True
+        assert manager.is_fresh(replica) is fresh
+        assert manager.is_fresh(manager._sessionmaker())
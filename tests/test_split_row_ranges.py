@@ -0,0 +1,110 @@
+import csv
+import io
+import random
+
+import pytest
+
+from src.services import ingest
+
+PIECES = ["a", "b c", ",", "\n", '"', '""', "\r\n", "é", "'"]
+
+
+def random_rows(seed: int, count: int) -> list[list[str]]:
+    rng = random.Random(seed)
+    return [
+        ["".join(rng.choice(PIECES) for _ in range(rng.randrange(6))) for _ in range(3)]
+        for _ in range(count)
+    ]
+
+
+def write_csv(path, rows: list[list[str]]):
+    with open(path, "w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.writer(csv_file, lineterminator="\n")
+        writer.writerow(["first", "second", "third"])
+        writer.writerows(rows)
+
+
+def read_ranges(path, header: bytes, ranges) -> list[list[str]]:
+    rows = []
+    with open(path, "rb") as csv_file:
+        for start, end in ranges:
+            csv_file.seek(start)
+            data = header + csv_file.read(end - start)
+            reader = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+            assert next(reader) == ["first", "second", "third"]
+            rows.extend(reader)
+    return rows
+
+
+def check_ranges(path, header: bytes, ranges):
+    assert header == b"first,second,third\n"
+    # contiguous, from the end of the header to the end of the file.
+    assert ranges[0][0] == len(header)
+    assert ranges[-1][1] == path.stat().st_size
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("chunk_bytes", [1, 5, 17, 100, 1 << 20])
+def test_ranges_split_on_rows(tmp_path, seed, chunk_bytes):
+    rows = random_rows(seed, 200)
+    path = tmp_path / "content.csv"
+    write_csv(path, rows)
+
+    header, ranges = ingest.split_row_ranges(str(path), chunk_bytes)
+
+    check_ranges(path, header, ranges)
+    assert read_ranges(path, header, ranges) == rows
+    if chunk_bytes == 1:
+        # every range ends at the first row boundary.
+        assert len(ranges) == len(rows)
+
+
+def stray_quote_field(rng: random.Random) -> str:
+    """A csv field as written by hand, with quotes csv.writer would escape."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        # a quote inside an unquoted field is part of it.
+        return "a" + "".join(rng.choice(["b c", '"']) for _ in range(rng.randrange(4)))
+    value = "".join(rng.choice(PIECES) for _ in range(rng.randrange(6)))
+    quoted = '"' + value.replace('"', '""') + '"'
+    if kind == 1:
+        # characters after the closing quote are appended to the value.
+        return quoted + rng.choice(["x", 'x"', 'x"y'])
+    return quoted
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("chunk_bytes", [1, 5, 17, 100])
+def test_stray_quotes_do_not_split_quoted_values(tmp_path, seed, chunk_bytes):
+    rng = random.Random(seed)
+    lines = [",".join(stray_quote_field(rng) for _ in range(3)) for _ in range(200)]
+    path = tmp_path / "content.csv"
+    path.write_bytes(("first,second,third\n" + "\n".join(lines) + "\n").encode())
+    with open(path, encoding="utf-8", newline="") as csv_file:
+        rows = list(csv.reader(csv_file))[1:]
+
+    header, ranges = ingest.split_row_ranges(str(path), chunk_bytes)
+
+    check_ranges(path, header, ranges)
+    assert read_ranges(path, header, ranges) == rows
+
+
+def test_stray_quote_before_a_quoted_newline(tmp_path):
+    path = tmp_path / "content.csv"
+    path.write_bytes(b'first,second,third\n1,a"b,c\n2,"d\ne",f\n3,g,h\n')
+
+    header, ranges = ingest.split_row_ranges(str(path), 1)
+
+    assert read_ranges(path, header, ranges) == [
+        ["1", 'a"b', "c"],
+        ["2", "d\ne", "f"],
+        ["3", "g", "h"],
+    ]
+
+
+def test_empty_file_has_no_ranges(tmp_path):
+    path = tmp_path / "content.csv"
+    path.write_bytes(b"first,second,third\n")
+
+    assert ingest.split_row_ranges(str(path), 10) == (b"first,second,third\n", [])